@@ -0,0 +1,115 @@
+import asyncio
+import json
+import logging
+import os
+
+from fastapi import HTTPException
+
+from converter import get_product_ids_batch_async, validate_tokopedia_url_async
+from pipeline import get_summary, StageLimits, MODEL_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+
+# ─────────────────────────────────────────────
+#  KONFIGURASI
+# ─────────────────────────────────────────────
+BATCH_MAX_URLS            = int(os.getenv("BATCH_MAX_URLS", 500))
+BATCH_RESOLVE_CONCURRENCY = int(os.getenv("BATCH_RESOLVE_CONCURRENCY", 10))  # validasi URL + product id
+BATCH_LOOKUP_SIZE         = int(os.getenv("BATCH_LOOKUP_SIZE", 20))          # URL per POST PDPMainInfo
+BATCH_SCRAPE_CONCURRENCY  = int(os.getenv("BATCH_SCRAPE_CONCURRENCY", 4))    # produk yang di-scrape bersamaan
+BATCH_MODEL_CONCURRENCY   = int(os.getenv("BATCH_MODEL_CONCURRENCY", MODEL_CONCURRENCY))
+
+
+def default_limits() -> StageLimits:
+    return StageLimits(
+        resolve=BATCH_RESOLVE_CONCURRENCY,
+        scrape=BATCH_SCRAPE_CONCURRENCY,
+        model=BATCH_MODEL_CONCURRENCY,
+    )
+
+
+# ─────────────────────────────────────────────
+#  RESOLVE PRODUCT ID PER KELOMPOK
+# ─────────────────────────────────────────────
+async def _prefetch_product_ids(urls: list[str], limits: StageLimits) -> None:
+    """
+    Resolve product id sekelompok URL dengan satu POST PDPMainInfo
+    (get_product_ids_batch_async) untuk mengisi cache resolve converter,
+    sehingga resolve_product per produk di get_summary tinggal cache hit.
+    Kegagalan diabaikan: produk itu di-resolve sendiri seperti biasa dan
+    error-nya dilaporkan dari sana.
+    """
+    async def validate(url: str) -> str | None:
+        async with limits.resolve:
+            try:
+                return await validate_tokopedia_url_async(url)
+            except HTTPException:
+                return None
+
+    valid = [url for url in await asyncio.gather(*(validate(u) for u in urls)) if url]
+    if not valid:
+        return
+    try:
+        async with limits.resolve:
+            await get_product_ids_batch_async(valid)
+    except Exception as e:
+        logger.warning(f"Batch: resolve {len(valid)} URL sekaligus gagal: {e}")
+
+
+# ─────────────────────────────────────────────
+#  RINGKASAN BANYAK PRODUK
+# ─────────────────────────────────────────────
+async def _summarize_one(index: int, url: str, limits: StageLimits, prefetch: asyncio.Task) -> dict:
+    await prefetch
+    try:
+        result = await get_summary(url, limits=limits)
+    except HTTPException as e:
+        return {"index": index, "url": url, "status": "error", "detail": e.detail}
+    except Exception as e:
+        logger.error(f"Batch: gagal meringkas {url}: {e}")
+        return {"index": index, "url": url, "status": "error",
+                "detail": "Terjadi kesalahan internal. Silakan coba lagi."}
+
+    return {
+        "index": index,
+        "url": url,
+        "status": "ok",
+        "product_id": result["product_id"],
+        "summary": result["summary_html"],
+        "raw_summary": result["raw_summary"],
+        "jumlah_ulasan": result["total_reviews"],
+        "cached": "is_fresh" in result,
+    }
+
+
+async def summarize_batch(urls: list[str], limits: StageLimits | None = None):
+    """
+    Async generator hasil per produk, dikirim begitu produk itu selesai
+    (bukan urutan input — pakai `index`). Semua produk berjalan bersamaan;
+    tiap tahap dibatasi semaphore-nya sendiri sehingga resolve produk
+    berikutnya tetap jalan selagi produk lain menunggu model. Product id
+    di-resolve per BATCH_LOOKUP_SIZE URL dalam satu request.
+    """
+    limits = limits or default_limits()
+    size = max(1, BATCH_LOOKUP_SIZE)
+    prefetches = [
+        asyncio.create_task(_prefetch_product_ids(urls[start:start + size], limits))
+        for start in range(0, len(urls), size)
+    ]
+    tasks = [
+        asyncio.create_task(_summarize_one(i, url, limits, prefetches[i // size]))
+        for i, url in enumerate(urls)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # client putus → batalkan produk yang belum selesai
+        for task in prefetches + tasks:
+            task.cancel()
+
+
+async def stream_batch_ndjson(urls: list[str]):
+    async for item in summarize_batch(urls):
+        yield json.dumps(item, ensure_ascii=False) + "\n"
@@ -0,0 +1,85 @@
+"""
+Ringkas banyak produk Tokopedia sekaligus, hasil NDJSON (satu baris per produk).
+
+    python batch_summarize.py urls.txt > hasil.ndjson
+    cat urls.txt | python batch_summarize.py -
+    python batch_summarize.py urls.txt --server http://localhost:8001
+
+Tanpa --server pipeline dijalankan langsung di proses ini (cache ringkasan
+dan ulasan yang sama dengan server tetap dipakai). Dengan --server, URL
+dikirim ke endpoint POST /summarize/batch.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+import httpx
+
+
+def read_urls(path: str) -> list[str]:
+    source = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with source:
+        return [line.strip() for line in source if line.strip() and not line.startswith("#")]
+
+
+async def run_local(urls: list[str], out) -> int:
+    from batch import summarize_batch
+    from gql_client import close_client
+    from model_client import close_model_client
+    from scrap_orcess import shutdown_clean_pool
+
+    failed = 0
+    try:
+        async for item in summarize_batch(urls):
+            failed += item["status"] != "ok"
+            out.write(json.dumps(item, ensure_ascii=False) + "\n")
+            out.flush()
+            print(f"[{item['index'] + 1}/{len(urls)}] {item['status']} {item['url']}", file=sys.stderr)
+    finally:
+        await close_client()
+        await close_model_client()
+        shutdown_clean_pool()
+    return failed
+
+
+async def run_remote(urls: list[str], server: str, out) -> int:
+    failed = 0
+    async with httpx.AsyncClient(timeout=httpx.Timeout(10.0, read=None)) as client:
+        async with client.stream("POST", f"{server.rstrip('/')}/summarize/batch", json={"urls": urls}) as response:
+            if response.status_code != 200:
+                body = (await response.aread()).decode(errors="replace")
+                print(f"Server menolak batch ({response.status_code}): {body}", file=sys.stderr)
+                return len(urls)
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                item = json.loads(line)
+                failed += item["status"] != "ok"
+                out.write(line + "\n")
+                out.flush()
+    return failed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("urls", help="file berisi satu URL per baris, atau - untuk stdin")
+    parser.add_argument("--server", help="kirim ke server yang sedang berjalan, mis. http://localhost:8001")
+    args = parser.parse_args()
+
+    urls = read_urls(args.urls)
+    if not urls:
+        print("Tidak ada URL", file=sys.stderr)
+        return 1
+
+    if args.server:
+        failed = asyncio.run(run_remote(urls, args.server, sys.stdout))
+    else:
+        failed = asyncio.run(run_local(urls, sys.stdout))
+
+    print(f"Selesai: {len(urls) - failed} berhasil, {failed} gagal", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Cek regresi + benchmark pembersih teks.
+
+    python -m benchmarks.bench_cleaning [--reviews N] [--repeat R]
+
+Output ReviewCleaner (per ulasan maupun batch) dibandingkan byte-per-byte
+dengan fungsi lama di benchmarks/reference.py, lalu keduanya diukur waktunya.
+"""
+import argparse
+import sys
+import time
+
+from benchmarks import reference
+from benchmarks.corpus import EDGE_CASES, generate_corpus
+from scrap_orcess import clean_review_text, review_cleaner
+
+
+def check_identical(corpus: list[str]) -> int:
+    expected = [reference.clean_review_text(t) for t in corpus]
+    single = [clean_review_text(t) for t in corpus]
+    batch = review_cleaner.clean_batch(corpus)
+
+    mismatches = 0
+    for text, want, got_single, got_batch in zip(corpus, expected, single, batch):
+        if want != got_single or want != got_batch:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  MISMATCH: {text!r}\n    lama  : {want!r}\n    single: {got_single!r}\n    batch : {got_batch!r}")
+    return mismatches
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = EDGE_CASES + generate_corpus(args.reviews)
+
+    print(f"Korpus regresi: {len(corpus)} ulasan")
+    mismatches = check_identical(corpus)
+    print(f"  Output identik: {'ya' if not mismatches else f'TIDAK ({mismatches} beda)'}")
+
+    legacy = best_of(lambda: [reference.clean_review_text(t) for t in corpus], args.repeat)
+    single = best_of(lambda: [clean_review_text(t) for t in corpus], args.repeat)
+    batch = best_of(lambda: review_cleaner.clean_batch(corpus), args.repeat)
+
+    print(f"\n  {'varian':<28}{'total (ms)':>12}{'per ulasan (µs)':>18}{'speedup':>10}")
+    for name, secs in [("clean_review_text lama", legacy),
+                       ("ReviewCleaner.clean", single),
+                       ("ReviewCleaner.clean_batch", batch)]:
+        print(f"  {name:<28}{secs * 1e3:>12.1f}{secs / len(corpus) * 1e6:>18.1f}{legacy / secs:>9.2f}x")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
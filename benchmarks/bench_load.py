@@ -0,0 +1,203 @@
+"""
+Benchmark beban end-to-end tanpa jaringan.
+
+    python -m benchmarks.bench_load [--clients 10] [--requests 200]
+        [--endpoint summarize|get_review|both] [--products N]
+        [--gql-latency 0.05] [--gql-error-rate 0]
+        [--model-latency 0.2] [--model-error-rate 0] [--reviews 120]
+        [--workers 1] [--shared-state sqlite|redis]
+
+Menjalankan tiga proses lokal: benchmarks.fake_gql (rekaman PDPMainInfo /
+productReviewList), stub_model_server (model /summarize), dan app main.py
+yang diarahkan ke keduanya lewat GQL_BASE_URL / MODEL_API_URL, dengan cache
+SQLite di direktori sementara dan rate limiter dimatikan. Lalu N client
+bersamaan menembak endpoint dan p50/p95/p99 serta req/s dilaporkan.
+
+Default --products sama dengan --requests: tiap request produk baru
+(cache dingin, pipeline penuh). --products kecil mengukur jalur cache.
+
+--workers > 1 menjalankan app dengan beberapa worker uvicorn yang berbagi
+state lewat SHARED_STATE_URL: file SQLite di direktori sementara, atau
+benchmarks.fake_redis sebagai proses keempat dengan --shared-state redis.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRODUCT_URL = "https://www.tokopedia.com/toko-bench/produk-{}"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Proses {proc.args} berhenti dengan kode {proc.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Port {port} tidak siap setelah {timeout}s")
+
+
+def start_servers(args, workdir: str) -> tuple[list[subprocess.Popen], str]:
+    gql_port, model_port, app_port, state_port = free_port(), free_port(), free_port(), free_port()
+    env = dict(os.environ, PYTHONPATH=ROOT)
+
+    gql_env = dict(env,
+                   FAKE_GQL_LATENCY=str(args.gql_latency),
+                   FAKE_GQL_ERROR_RATE=str(args.gql_error_rate),
+                   FAKE_GQL_TOTAL_REVIEWS=str(args.reviews))
+    model_env = dict(env,
+                     STUB_PORT=str(model_port),
+                     STUB_BASE_LATENCY=str(args.model_latency),
+                     STUB_FAIL_RATE=str(args.model_error_rate))
+    app_env = dict(env,
+                   GQL_BASE_URL=f"http://127.0.0.1:{gql_port}/graphql",
+                   GQL_RATE_PER_SEC="100000",
+                   MODEL_API_URL=f"http://127.0.0.1:{model_port}/summarize",
+                   SUMMARY_CACHE_PATH=os.path.join(workdir, "summary_cache.sqlite3"),
+                   REVIEW_STORE_PATH=os.path.join(workdir, "reviews.sqlite3"),
+                   RATE_LIMIT_ENABLED="0",
+                   WEB_CONCURRENCY=str(args.workers))
+    if args.workers > 1:
+        app_env["SHARED_STATE_URL"] = (
+            f"redis://127.0.0.1:{state_port}/0" if args.shared_state == "redis"
+            else f"sqlite:///{os.path.join(workdir, 'shared_state.sqlite3')}"
+        )
+
+    quiet = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL, "cwd": ROOT}
+    procs, ports = [], []
+    if args.workers > 1 and args.shared_state == "redis":
+        procs.append(subprocess.Popen([sys.executable, "-m", "benchmarks.fake_redis", "--port", str(state_port)], env=env, **quiet))
+        ports.append(state_port)
+    procs += [
+        subprocess.Popen([sys.executable, "-m", "benchmarks.fake_gql", "--port", str(gql_port)], env=gql_env, **quiet),
+        subprocess.Popen([sys.executable, "stub_model_server.py"], env=model_env, **quiet),
+        subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+                          "--port", str(app_port), "--log-level", "warning",
+                          "--workers", str(args.workers)], env=app_env, **quiet),
+    ]
+    ports += [gql_port, model_port, app_port]
+    try:
+        for port, proc in zip(ports, procs):
+            wait_for_port(port, proc)
+    except Exception:
+        stop_servers(procs)
+        raise
+    return procs, f"http://127.0.0.1:{app_port}"
+
+
+def stop_servers(procs: list[subprocess.Popen]) -> None:
+    for proc in procs:
+        proc.terminate()
+    for proc in procs:
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+async def call_summarize(client: httpx.AsyncClient, i: int) -> bool:
+    response = await client.post("/summarize", data={"product_url": PRODUCT_URL.format(i)})
+    # /summarize selalu 200; error ditampilkan di kotak error halaman
+    return response.status_code == 200 and 'id="errorBox" hidden' in response.text
+
+
+async def call_get_review(client: httpx.AsyncClient, i: int) -> bool:
+    response = await client.post("/get_review", params={"url_produk": PRODUCT_URL.format(i)})
+    return response.status_code == 200 and isinstance(response.json(), list)
+
+
+ENDPOINTS = {"summarize": call_summarize, "get_review": call_get_review}
+
+
+async def drive(base_url: str, call, clients: int, requests: int, products: int) -> dict:
+    latencies, errors = [], 0
+    counter = iter(range(requests))
+
+    async def client_loop(client: httpx.AsyncClient):
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                ok = await call(client, i % products)
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    limits = httpx.Limits(max_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def pct(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1e3
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50": pct(50),
+        "p95": pct(95),
+        "p99": pct(99),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--endpoint", choices=["summarize", "get_review", "both"], default="both")
+    parser.add_argument("--products", type=int, default=None, help="jumlah produk berbeda (default = --requests)")
+    parser.add_argument("--gql-latency", type=float, default=0.05)
+    parser.add_argument("--gql-error-rate", type=float, default=0.0)
+    parser.add_argument("--model-latency", type=float, default=0.2)
+    parser.add_argument("--model-error-rate", type=float, default=0.0)
+    parser.add_argument("--reviews", type=int, default=120, help="jumlah ulasan per produk di fake GQL")
+    parser.add_argument("--workers", type=int, default=1, help="jumlah worker uvicorn app")
+    parser.add_argument("--shared-state", choices=["sqlite", "redis"], default="sqlite",
+                        help="backend state bersama jika --workers > 1")
+    args = parser.parse_args()
+
+    endpoints = list(ENDPOINTS) if args.endpoint == "both" else [args.endpoint]
+    products = args.products or args.requests
+
+    print(f"{args.clients} client, {args.requests} request/endpoint, {products} produk, "
+          f"GQL {args.gql_latency * 1e3:.0f}ms err {args.gql_error_rate:.0%}, "
+          f"model {args.model_latency * 1e3:.0f}ms err {args.model_error_rate:.0%}, "
+          f"{args.workers} worker" + (f" ({args.shared_state})" if args.workers > 1 else ""))
+    print(f"\n  {'endpoint':<12}{'request':>9}{'error':>7}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        procs, base_url = start_servers(args, workdir)
+        try:
+            for name in endpoints:
+                r = asyncio.run(drive(base_url, ENDPOINTS[name], args.clients, args.requests, products))
+                print(f"  {name:<12}{r['requests']:>9}{r['errors']:>7}{r['rps']:>9.1f}"
+                      f"{r['p50']:>10.0f}{r['p95']:>10.0f}{r['p99']:>10.0f}")
+        finally:
+            stop_servers(procs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
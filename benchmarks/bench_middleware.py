@@ -0,0 +1,132 @@
+"""
+Benchmark overhead middleware: stack BaseHTTPMiddleware lama vs
+middleware.SecurityMiddleware (ASGI murni).
+
+    python -m benchmarks.bench_middleware [--requests 2000] [--concurrency 20]
+
+Kedua app memakai route dan middleware lain yang sama dengan main.py
+(SlowAPI, CORS, TrustedHost); hanya lapisan size-limit/security-headers/
+logging yang berbeda. Request dikirim in-process lewat httpx.ASGITransport,
+jadi angka req/s murni biaya framework + middleware tanpa jaringan.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import HTMLResponse
+from fastapi.staticfiles import StaticFiles
+from fastapi.templating import Jinja2Templates
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.middleware import SlowAPIASGIMiddleware, SlowAPIMiddleware
+from slowapi.util import get_remote_address
+
+from benchmarks import legacy_middleware
+from middleware import SecurityMiddleware
+from static_assets import AssetUrls, load_manifest
+
+STATIC_PATH = "/static/navbar-share.jpeg"
+
+
+def build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+    # limit sangat longgar: biaya pengecekan tetap dihitung, tapi tidak pernah 429
+    app.state.limiter = Limiter(key_func=get_remote_address, default_limits=["1000000/minute"])
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    app.add_middleware(SlowAPIMiddleware if legacy else SlowAPIASGIMiddleware)
+    app.add_middleware(CORSMiddleware, allow_origins=["http://localhost:8001"],
+                       allow_methods=["GET", "POST"], allow_headers=["Content-Type"])
+    app.add_middleware(TrustedHostMiddleware, allowed_hosts=["localhost"])
+    if legacy:
+        app.add_middleware(legacy_middleware.RequestSizeLimitMiddleware)
+        app.add_middleware(legacy_middleware.SecurityHeadersMiddleware)
+        app.add_middleware(legacy_middleware.RequestLoggingMiddleware)
+    else:
+        app.add_middleware(SecurityMiddleware)
+
+    templates = Jinja2Templates(directory="templates")
+    asset_urls = AssetUrls(load_manifest())
+    templates.env.globals.update(asset_url=asset_urls.url, asset_srcset=asset_urls.srcset)
+    app.mount("/static", StaticFiles(directory="static"), name="static")
+
+    @app.get("/", response_class=HTMLResponse)
+    async def home(request: Request):
+        return templates.TemplateResponse("index.html", {"request": request, "summary": None, "error": None})
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        return {"size": len(await request.body())}
+
+    return app
+
+
+async def run(app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                response = await client.get(path)
+                assert response.status_code == 200, response.status_code
+
+        await asyncio.gather(*(one() for _ in range(min(50, requests))))  # pemanasan
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return requests / (time.perf_counter() - start)
+
+
+async def check(app: FastAPI) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+        home = await client.get("/")
+
+        async def chunked_body():
+            # 100 KB tanpa Content-Length
+            for _ in range(100):
+                yield b"x" * 1024
+
+        chunked = await client.post("/echo", content=chunked_body())
+        sized = await client.post("/echo", content=b"x" * (100 * 1024))
+    return {
+        "security headers": home.headers.get("x-frame-options") == "DENY",
+        "413 (Content-Length)": sized.status_code == 413,
+        "413 (chunked)": chunked.status_code == 413,
+    }
+
+
+async def main_async(args) -> int:
+    apps = {"BaseHTTPMiddleware": build_app(legacy=True), "ASGI murni": build_app(legacy=False)}
+
+    print(f"  {'cek':<24}" + "".join(f"{name:>22}" for name in apps))
+    results = {name: await check(app) for name, app in apps.items()}
+    for key in results["ASGI murni"]:
+        print(f"  {key:<24}" + "".join(f"{'ya' if results[name][key] else 'tidak':>22}" for name in apps))
+
+    print(f"\n  {'path':<32}" + "".join(f"{name + ' (req/s)':>26}" for name in apps) + f"{'speedup':>10}")
+    for path in ["/", STATIC_PATH]:
+        rates = [await run(app, path, args.requests, args.concurrency) for app in apps.values()]
+        print(f"  {path:<32}" + "".join(f"{rate:>26.0f}" for rate in rates) + f"{rates[1] / rates[0]:>9.2f}x")
+
+    return 0 if all(results["ASGI murni"].values()) else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    # log per request dimatikan di kedua stack supaya I/O terminal tidak ikut terukur
+    logging.getLogger("main").setLevel(logging.ERROR)
+    return asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
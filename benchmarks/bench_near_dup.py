@@ -0,0 +1,61 @@
+"""
+Benchmark cluster_near_duplicates + cek kasus yang hasilnya sudah pasti.
+
+    python -m benchmarks.bench_near_dup [--sizes 200 2000 20000]
+
+Korpus dibersihkan dulu (seperti di pipeline) lalu di-cluster; dilaporkan
+waktu dan jumlah cluster. Setiap kasus di CASES harus menghasilkan cluster
+persis seperti yang diharapkan, kalau tidak exit code 1.
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.corpus import ADVERSARIAL_RATE, CORPUS_SIZES, generate_corpus
+from near_dup import cluster_near_duplicates
+from scrap_orcess import review_cleaner
+
+# (ulasan, cluster yang diharapkan)
+CASES = [
+    # negasi membalik makna → tidak boleh digabung meski Jaccard-nya tinggi
+    (["barang sesuai pesanan pengiriman cepat",
+      "barang tidak sesuai pesanan pengiriman cepat"], [(0, 1), (1, 1)]),
+    (["kualitas bagus pengiriman cepat seller ramah respon cepat",
+      "kualitas kurang bagus pengiriman cepat seller ramah respon cepat"], [(0, 1), (1, 1)]),
+    (["barang sesuai pesanan tapi pengiriman tidak cepat",
+      "barang tidak sesuai pesanan tapi pengiriman cepat"], [(0, 1), (1, 1)]),
+    # negasi yang sama tetap digabung
+    (["barang tidak sesuai pesanan pengiriman lama",
+      "barang tidak sesuai pesanan pengiriman lama sekali"], [(0, 2)]),
+    (["barang sesuai pesanan pengiriman cepat",
+      "barang sesuai pesanan pengiriman cepat sekali",
+      "seller ramah"], [(0, 2), (2, 1)]),
+]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(CORPUS_SIZES))
+    args = parser.parse_args()
+
+    failures = 0
+    for texts, expected in CASES:
+        got = cluster_near_duplicates(texts)
+        if got != expected:
+            failures += 1
+            print(f"  BEDA! {texts}\n        harap {expected}, dapat {got}")
+    print(f"  {len(CASES) - failures}/{len(CASES)} kasus sesuai\n")
+
+    print(f"  {'ulasan':>8}{'cluster':>10}{'waktu (ms)':>12}")
+    for n in args.sizes:
+        texts = review_cleaner.clean_batch(generate_corpus(n, adversarial_rate=ADVERSARIAL_RATE))
+        start = time.perf_counter()
+        clusters = cluster_near_duplicates(texts)
+        elapsed = time.perf_counter() - start
+        print(f"  {n:>8}{len(clusters):>10}{elapsed * 1e3:>12.1f}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
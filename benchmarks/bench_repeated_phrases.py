@@ -0,0 +1,116 @@
+"""
+Benchmark remove_repeated_phrases untuk kasus terburuk.
+
+    python -m benchmarks.bench_repeated_phrases [--words 5000] [--legacy-max-words 1000]
+
+Versi lama (benchmarks/reference.py) kira-kira kubik, jadi hanya diukur
+sampai --legacy-max-words; versi baru diukur pada semua ukuran dan dicek
+sama persis dengan versi lama di ukuran yang sama. Kasus spam (SPAM_CASES)
+murah untuk versi lama, jadi diukur di semua ukuran. Exit code 1 jika hasil
+beda atau versi baru lebih lambat dari versi lama melebihi --tolerance.
+"""
+import argparse
+import random
+import sys
+import time
+
+from benchmarks import reference
+from benchmarks.corpus import WORDS
+from scrap_orcess import remove_repeated_phrases
+
+
+def no_repeat(n: int, rng: random.Random) -> str:
+    # teks biasa tanpa frasa berulang — kasus terburuk versi lama
+    return " ".join(f"{rng.choice(WORDS)}{i}" for i in range(n))
+
+
+def one_word(n: int, rng: random.Random) -> str:
+    return " ".join(["mantap"] * n)
+
+
+def copy_paste(n: int, rng: random.Random) -> str:
+    phrase = "barang bagus pengiriman cepat seller ramah".split()
+    return " ".join((phrase * (n // len(phrase) + 1))[:n])
+
+
+def near_period(n: int, rng: random.Random) -> str:
+    # "x y a1 x y a2 ..." — pola hampir periodik tanpa square
+    out = []
+    for i in range(n // 3 + 1):
+        out += ["barang", "bagus", f"kata{i}"]
+    return " ".join(out[:n])
+
+
+def two_words(n: int, rng: random.Random) -> str:
+    # spam periode 2: "bagus banget bagus banget ..."
+    return " ".join((["bagus", "banget"] * (n // 2 + 1))[:n])
+
+
+def copy_paste_long(n: int, rng: random.Random) -> str:
+    # satu paragraf 40 kata ditempel berulang
+    phrase = [f"{rng.choice(WORDS)}{i}" for i in range(40)]
+    return " ".join((phrase * (n // len(phrase) + 1))[:n])
+
+
+def spam_with_intro(n: int, rng: random.Random) -> str:
+    intro = [f"{rng.choice(WORDS)}{i}" for i in range(20)]
+    return " ".join(intro + copy_paste(n - len(intro), rng).split())
+
+
+def small_alphabet(n: int, rng: random.Random) -> str:
+    return " ".join(rng.choice(["ok", "bagus", "mantap"]) for _ in range(n))
+
+
+CASES = [no_repeat, one_word, two_words, copy_paste, copy_paste_long, spam_with_intro,
+         near_period, small_alphabet]
+# versi lama cepat di sini (square langsung ketemu), jadi diukur di semua ukuran
+SPAM_CASES = {one_word, two_words, copy_paste, copy_paste_long, spam_with_intro}
+SLACK_SECS = 0.0002    # toleransi absolut untuk waktu di bawah ~1 ms
+
+
+def timed(fn, text: str, repeat: int = 5) -> tuple[float, str]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--words", type=int, default=5000)
+    parser.add_argument("--legacy-max-words", type=int, default=1000)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="batas lebih lambat dari versi lama")
+    args = parser.parse_args()
+
+    sizes = sorted({100, 400, 1000, args.words})
+    rng = random.Random(7)
+    failures = 0
+
+    print(f"  {'kasus':<16}{'kata':>7}{'lama (ms)':>12}{'baru (ms)':>12}")
+    for case in CASES:
+        for n in sizes:
+            text = case(n, rng)
+            new_secs, new_out = timed(remove_repeated_phrases, text)
+            note = ""
+            if n <= args.legacy_max_words or case in SPAM_CASES:
+                old_secs, old_out = timed(reference.remove_repeated_phrases, text,
+                                          repeat=5 if case in SPAM_CASES else 1)
+                old_col = f"{old_secs * 1e3:>12.2f}"
+                if old_out != new_out:
+                    failures += 1
+                    note = "  BEDA!"
+                elif new_secs > old_secs * (1 + args.tolerance) + SLACK_SECS:
+                    failures += 1
+                    note = "  LEBIH LAMBAT!"
+            else:
+                old_col = f"{'(skip)':>12}"
+            print(f"  {case.__name__:<16}{n:>7}{old_col}{new_secs * 1e3:>12.2f}{note}")
+
+    print(f"\n{'Lulus' if not failures else f'{failures} kasus gagal'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Scrape penuh vs refresh inkremental lewat review store + cek set ulasannya.
+
+    python -m benchmarks.bench_review_store [--reviews 200]
+
+Halaman ulasan dilayani in-process (tanpa jaringan) dengan timestamp relatif
+sampai batas jendela umur ("12 bulan lalu", "1 tahun lalu"). Dilaporkan
+waktu load_reviews untuk scrape penuh dan refresh tanpa ulasan baru; exit
+code 1 jika review_set_hash keduanya berbeda, karena hash yang berubah
+untuk produk yang tidak berubah memicu ringkasan ulang.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import sys
+import tempfile
+import time
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+TIMESTAMPS = ["1 hari lalu", "2 minggu lalu", "6 bulan lalu", "11 bulan lalu",
+              "12 bulan lalu", "1 tahun lalu", "lebih dari 1 tahun"]
+
+
+def make_pages(total: int, limit: int = 10) -> dict[int, dict]:
+    with open(os.path.join(FIXTURES, "product_review_list.json"), encoding="utf-8") as f:
+        template = json.load(f)[0]["data"]["productrevGetProductReviewList"]
+
+    pages = {}
+    last_page = -(-total // limit)
+    for page in range(1, last_page + 1):
+        items = []
+        for i in range((page - 1) * limit, min(page * limit, total)):
+            item = copy.deepcopy(template["list"][i % len(template["list"])])
+            item["id"] = str(10_000 + total - i)
+            item["message"] = f"ulasan nomor {i} barang sesuai pesanan"
+            item["reviewCreateTimestamp"] = TIMESTAMPS[min(i * len(TIMESTAMPS) // total, len(TIMESTAMPS) - 1)]
+            items.append(item)
+        body = dict(template, list=items, hasNext=page < last_page, totalReviews=total)
+        pages[page] = body
+    return pages
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ["REVIEW_STORE_PATH"] = os.path.join(tempfile.mkdtemp(), "reviews.sqlite3")
+    import scrapper
+    from scrap_orcess import load_reviews, review_set_hash
+
+    pages = make_pages(args.reviews)
+
+    async def fetch_page(product_id, page, limit=10):
+        return copy.deepcopy(pages.get(page))
+
+    async def fetch_batch(product_id, page_list, limit=10):
+        return [copy.deepcopy(pages.get(page)) for page in page_list]
+
+    scrapper.fetch_reviews_async = fetch_page
+    scrapper.fetch_reviews_batch_async = fetch_batch
+
+    async def run(label: str) -> str:
+        start = time.perf_counter()
+        reviews = await load_reviews("1", max_reviews=args.reviews)
+        elapsed = time.perf_counter() - start
+        digest = review_set_hash([r["message"] for r in reviews])
+        print(f"  {label:<22}{len(reviews):>8}{elapsed * 1e3:>12.1f}   {digest[:12]}")
+        return digest
+
+    async def go() -> bool:
+        print(f"  {'jalur':<22}{'ulasan':>8}{'waktu (ms)':>12}   hash")
+        full = await run("scrape penuh")
+        refresh = await run("refresh inkremental")
+        return full == refresh
+
+    same = asyncio.run(go())
+    print(f"\n{'Hash sama' if same else 'Hash BEDA: refresh tanpa perubahan memicu ringkasan ulang'}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
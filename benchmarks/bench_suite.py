@@ -0,0 +1,126 @@
+"""
+Suite micro-benchmark fungsi pembersih teks: waktu dan alokasi memori per
+fungsi pada korpus 200 / 2k / 20k ulasan (termasuk ulasan ekstrem: tawa,
+keyboard smash, emoji, copy-paste ratusan kali).
+
+    python -m benchmarks.bench_suite                       # tampilkan hasil
+    python -m benchmarks.bench_suite --save benchmarks/baseline_cleaning.json
+    python -m benchmarks.bench_suite --compare benchmarks/baseline_cleaning.json [--check-time]
+
+Dengan --compare, exit code 1 jika alokasi puncak (atau waktu, dengan
+--check-time) naik lebih dari --tolerance dibanding baseline. Alokasi
+deterministik antar mesin; waktu hanya bermakna terhadap baseline yang
+direkam di mesin yang sama.
+
+Cache verdict kata (_keep_word) dikosongkan sebelum setiap pengukuran,
+jadi angka yang dilaporkan adalah kondisi cache dingin.
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from benchmarks.corpus import ADVERSARIAL_RATE, CORPUS_SIZES, generate_corpus
+from scrap_orcess import (
+    _keep_word,
+    clean_review_text,
+    remove_gibberish,
+    remove_gibberish_batch,
+    remove_repeated_phrases,
+    review_cleaner,
+)
+
+FUNCTIONS = {
+    "clean_review_text":         lambda corpus: [clean_review_text(t) for t in corpus],
+    "ReviewCleaner.clean_batch": review_cleaner.clean_batch,
+    "remove_gibberish":          lambda corpus: [remove_gibberish(t) for t in corpus],
+    "remove_gibberish_batch":    remove_gibberish_batch,
+    "remove_repeated_phrases":   lambda corpus: [remove_repeated_phrases(t) for t in corpus],
+}
+
+
+def measure_time(fn, corpus: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        _keep_word.cache_clear()
+        start = time.perf_counter()
+        fn(corpus)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_alloc(fn, corpus: list[str]) -> int:
+    # diukur terpisah dari waktu: tracemalloc memperlambat eksekusi beberapa kali lipat
+    _keep_word.cache_clear()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        result = fn(corpus)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak - base
+
+
+def run(sizes: list[int], repeat: int, names: list[str]) -> dict:
+    results = {}
+    for size in sizes:
+        corpus = generate_corpus(size, adversarial_rate=ADVERSARIAL_RATE)
+        for name in names:
+            fn = FUNCTIONS[name]
+            secs = measure_time(fn, corpus, repeat)
+            peak = measure_alloc(fn, corpus)
+            results[f"{name}@{size}"] = {"ms": round(secs * 1e3, 2), "peak_kib": round(peak / 1024, 1)}
+            print(f"  {name:<28}{size:>8}{secs * 1e3:>12.1f}{secs / size * 1e6:>14.1f}{peak / 1024:>14.0f}")
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float, check_time: bool) -> int:
+    regressions = 0
+    for key, now in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        metrics = ["peak_kib"] + (["ms"] if check_time else [])
+        for metric in metrics:
+            if old[metric] > 0 and now[metric] > old[metric] * (1 + tolerance):
+                regressions += 1
+                print(f"  REGRESI {key} {metric}: {old[metric]:.1f} → {now[metric]:.1f} "
+                      f"(+{(now[metric] / old[metric] - 1):.0%})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(CORPUS_SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", choices=list(FUNCTIONS), default=list(FUNCTIONS))
+    parser.add_argument("--save", help="simpan hasil sebagai baseline JSON")
+    parser.add_argument("--compare", help="bandingkan dengan baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--check-time", action="store_true", help="ikut gagalkan regresi waktu")
+    args = parser.parse_args()
+
+    print(f"  {'fungsi':<28}{'ulasan':>8}{'total (ms)':>12}{'per ulasan µs':>14}{'puncak KiB':>14}")
+    results = run(args.sizes, args.repeat, args.only)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nBaseline disimpan ke {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.check_time)
+        print(f"\n{'Tidak ada regresi' if not regressions else f'{regressions} regresi'} "
+              f"(toleransi {args.tolerance:.0%})")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Korpus ulasan sintetis bergaya Indonesia untuk uji regresi & benchmark
+fungsi pembersih teks. Deterministik untuk seed yang sama.
+"""
+import random
+
+
+WORDS = (
+    "barang bagus banget pengiriman cepat sesuai deskripsi penjual ramah "
+    "respon kualitas oke mantap murah harga packing rapi aman sampai "
+    "tepat waktu recommended seller terima kasih kak ukuran pas warna "
+    "bahan lembut tebal tipis jahitan kurang rapi kecewa lumayan puas "
+    "original ori asli kw awet baterai tahan lama dipakai anak suka "
+    "kurir lama nyampe rusak penyok kemasan bubble wrap dus"
+).split()
+
+LAUGHTER = ["wkwk", "wkwkwk", "hahaha", "hehe", "hihihi", "kwkwkw", "huhu", "WKWKWK"]
+SMASH    = ["asdfghjkl", "qwrtyp", "zxcvbnm", "bcdfghjk", "sdfghjklzx", "nmnmnmnm"]
+EMOJI    = ["😍", "👍", "🔥", "🙏", "😭", "❤️", "👍🏻", "🤣🤣🤣", "✨", "👨‍👩‍👧"]
+EMOTICON = [":)", ":D", ";)", ":(", ":P", "<3", "T_T", "x_x", "XD", "=)", ":-)", "(:"]
+SYMBOLS  = ["!!!", "??", "...", ",", "#1", "100%", "@seller", "&", "/", "-", "*****", "2x"]
+
+
+def _word(rng: random.Random) -> str:
+    w = rng.choice(WORDS)
+    roll = rng.random()
+    if roll < 0.05:
+        return w.upper()
+    if roll < 0.10:
+        return w.capitalize()
+    if roll < 0.15:
+        # karakter berlebih: "bagusss", "mantaaap"
+        i = rng.randrange(len(w))
+        return w[:i] + w[i] * rng.randint(3, 6) + w[i + 1:]
+    if roll < 0.18:
+        # kata nempel: "bagusbagus"
+        return w * rng.randint(2, 3)
+    return w
+
+
+def _phrase(rng: random.Random, n_words: int) -> list[str]:
+    return [_word(rng) for _ in range(n_words)]
+
+
+def generate_review(rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.03:
+        return ""
+    if kind < 0.06:
+        # frasa panjang yang di-copy-paste berulang
+        phrase = _phrase(rng, rng.randint(2, 5))
+        return " ".join(phrase * rng.randint(3, 12))
+    if kind < 0.09:
+        # kata tunggal berulang
+        return " ".join([rng.choice(WORDS)] * rng.randint(3, 8))
+
+    tokens = _phrase(rng, rng.randint(3, 30))
+    for _ in range(rng.randint(0, 4)):
+        pool = rng.choice([LAUGHTER, SMASH, EMOJI, EMOTICON, SYMBOLS])
+        tokens.insert(rng.randrange(len(tokens) + 1), rng.choice(pool))
+    if rng.random() < 0.2:
+        i = rng.randrange(len(tokens))
+        size = rng.randint(2, 4)
+        tokens[i:i] = tokens[i:i + size] * rng.randint(1, 3)
+
+    sep = rng.choice([" ", " ", " ", "  ", ". ", ", ", "\n"])
+    text = sep.join(tokens)
+    if rng.random() < 0.3:
+        text += rng.choice(["!!!", ".", "..", " 👍", " :)", " wkwk"])
+    return text
+
+
+def generate_adversarial(rng: random.Random) -> str:
+    """Ulasan ekstrem yang menjadi sasaran fungsi pembersih, jauh lebih panjang dari rata-rata."""
+    kind = rng.randrange(5)
+    if kind == 0:
+        # tawa panjang tanpa spasi
+        return rng.choice(["wk", "ha", "he", "kw"]) * rng.randint(20, 200)
+    if kind == 1:
+        # keyboard smash berderet
+        return " ".join(rng.choice(SMASH) + rng.choice(SMASH) for _ in range(rng.randint(5, 40)))
+    if kind == 2:
+        # deretan emoji / emoticon
+        return "".join(rng.choice(EMOJI + EMOTICON) for _ in range(rng.randint(20, 150)))
+    if kind == 3:
+        # copy-paste frasa ratusan kali
+        phrase = _phrase(rng, rng.randint(2, 6))
+        return " ".join(phrase * rng.randint(50, 200))
+    # teks panjang tanpa pengulangan (kasus terburuk deteksi frasa berulang)
+    return " ".join(f"{rng.choice(WORDS)}{i}" for i in range(rng.randint(200, 800)))
+
+
+def generate_corpus(n: int, seed: int = 42, adversarial_rate: float = 0.0) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        generate_adversarial(rng) if adversarial_rate and rng.random() < adversarial_rate else generate_review(rng)
+        for _ in range(n)
+    ]
+
+
+# Ukuran korpus standar untuk benchmarks/bench_suite.py
+CORPUS_SIZES = (200, 2000, 20000)
+ADVERSARIAL_RATE = 0.02
+
+
+# Kasus pinggir yang ditulis tangan
+EDGE_CASES = [
+    "",
+    " ",
+    "a",
+    "Bagus",
+    "...",
+    "😍😍😍",
+    # ulasan yang kosong setelah emoji/emoticon dibuang, berurutan: di
+    # clean_batch pemisahnya tidak boleh ikut dirapatkan REPEAT_CHAR
+    "barang bagus",
+    "👍👍",
+    "😀👍",
+    "🔥",
+    ":D",
+    "XD",
+    "<3",
+    "mantap sekali pengiriman cepat",
+    "ok ok ok ok ok",
+    "mantap mantap jiwa jiwa",
+    "barang bagus barang bagus barang bagus",
+    "wkwkwkwk hahaha hehehe",
+    "asdfghjkl qwerty zxcvbnm",
+    "baguuuuus bangettt!!!",
+    "bagusbagusbagus",
+    "XD :D :P <3 T_T x_x",
+    "harga 100rb, kualitas 100%",
+    "tidak\tsesuai\ndeskripsi\r\nkecewa",
+    "é è ñ ü naïve café",
+    "a b c d e f g",
+    "mmmmmmm hmmm brrrr",
+    "pengiriman cepat. packing rapi. seller ramah.",
+]
@@ -0,0 +1,124 @@
+"""
+GraphQL Tokopedia tiruan untuk benchmark offline.
+
+    python -m benchmarks.fake_gql [--port 8003]
+    GQL_BASE_URL=http://127.0.0.1:8003/graphql python main.py
+
+Respons dibangun dari rekaman di benchmarks/fixtures/: PDPMainInfo memakai
+rekaman apa adanya dengan product id turunan dari productKey, sedangkan
+productReviewList memakai struktur halaman rekaman dengan isi ulasan dari
+korpus sintetis (deterministik per produk), supaya dedup/near-dup di
+pipeline bekerja seperti pada data asli.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import random
+import zlib
+from functools import lru_cache
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from benchmarks.corpus import generate_corpus
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# ─────────────────────────────────────────────
+#  KONFIGURASI (env, supaya bisa diatur dari bench_load)
+# ─────────────────────────────────────────────
+FAKE_GQL_LATENCY       = float(os.getenv("FAKE_GQL_LATENCY", 0.05))   # detik per POST
+FAKE_GQL_JITTER        = float(os.getenv("FAKE_GQL_JITTER", 0.02))    # ± detik acak
+FAKE_GQL_ERROR_RATE    = float(os.getenv("FAKE_GQL_ERROR_RATE", 0))   # peluang POST dijawab 502
+FAKE_GQL_TOTAL_REVIEWS = int(os.getenv("FAKE_GQL_TOTAL_REVIEWS", 120))
+
+
+def _load(name: str):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+PDP_FIXTURE = _load("pdp_main_info.json")[0]
+REVIEW_FIXTURE = _load("product_review_list.json")[0]
+TIMESTAMPS = [r["reviewCreateTimestamp"] for r in REVIEW_FIXTURE["data"]["productrevGetProductReviewList"]["list"]]
+
+app = FastAPI()
+
+
+def _product_id(product_key: str) -> str:
+    return str(100000000000 + zlib.crc32(product_key.encode()) % 900000000000)
+
+
+def pdp_main_info(variables: dict) -> dict:
+    result = copy.deepcopy(PDP_FIXTURE)
+    info = result["data"]["pdpMainInfo"]["data"]["basicInfo"]
+    info["id"] = _product_id(variables.get("productKey", ""))
+    info["alias"] = variables.get("productKey", info["alias"])
+    return result
+
+
+@lru_cache(maxsize=256)
+def _messages(product_id: str) -> tuple[str, ...]:
+    return tuple(generate_corpus(FAKE_GQL_TOTAL_REVIEWS, seed=zlib.crc32(product_id.encode())))
+
+
+def product_review_list(variables: dict) -> dict:
+    product_id = str(variables["productID"])
+    page, limit = int(variables["page"]), int(variables["limit"])
+    start = (page - 1) * limit
+    stop = min(page * limit, FAKE_GQL_TOTAL_REVIEWS)
+
+    messages = _messages(product_id)
+    template = REVIEW_FIXTURE["data"]["productrevGetProductReviewList"]["list"]
+    items = []
+    for i in range(start, stop):
+        item = copy.deepcopy(template[i % len(template)])
+        item["id"] = str(int(product_id) % 100000 * 100000 + FAKE_GQL_TOTAL_REVIEWS - i)
+        # sebagian ulasan memakai teks rekaman asli, sisanya korpus sintetis
+        if i % 5:
+            item["message"] = messages[i]
+        item["productRating"] = 5 - (i * 7) % 5 // 2
+        item["reviewCreateTimestamp"] = TIMESTAMPS[min(i // 10, len(TIMESTAMPS) - 1)]
+        items.append(item)
+
+    result = copy.deepcopy(REVIEW_FIXTURE)
+    body = result["data"]["productrevGetProductReviewList"]
+    body["productID"] = product_id
+    body["list"] = items
+    body["hasNext"] = stop < FAKE_GQL_TOTAL_REVIEWS
+    body["totalReviews"] = FAKE_GQL_TOTAL_REVIEWS
+    return result
+
+
+HANDLERS = {"PDPMainInfo": pdp_main_info, "productReviewList": product_review_list}
+
+
+@app.post("/graphql/{operation}")
+async def graphql(operation: str, request: Request):
+    delay = FAKE_GQL_LATENCY + random.uniform(-FAKE_GQL_JITTER, FAKE_GQL_JITTER)
+    await asyncio.sleep(max(0.0, delay))
+    if FAKE_GQL_ERROR_RATE and random.random() < FAKE_GQL_ERROR_RATE:
+        return JSONResponse(status_code=502, content={"message": "fake_gql: bad gateway"})
+
+    out = []
+    for op in await request.json():
+        handler = HANDLERS.get(op.get("operationName"))
+        if handler is None:
+            out.append({"errors": [{"message": f"unknown operation {op.get('operationName')}"}]})
+        else:
+            out.append(handler(op.get("variables", {})))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8003)
+    args = parser.parse_args()
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Server ber-protokol Redis (RESP) tiruan untuk menguji shared_state tanpa Redis.
+
+    python -m benchmarks.fake_redis [--port 6390]
+    SHARED_STATE_URL=redis://127.0.0.1:6390/0 WEB_CONCURRENCY=4 python main.py
+
+Hanya perintah yang dipakai shared_state.RespBackend: PING, AUTH, SELECT,
+GET, SET [EX|PX] [NX], INCR/INCRBY, PEXPIRE, PTTL, DEL, SCAN, FLUSHDB.
+Satu proses, satu event loop, jadi setiap perintah atomik seperti di Redis.
+"""
+import argparse
+import asyncio
+import fnmatch
+import time
+
+# db → key → (value, expires_at | None)
+_dbs: dict[int, dict[str, tuple[str, float | None]]] = {}
+
+
+def _encode(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, bool):
+        return b":%d\r\n" % value
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode(v) for v in value)
+    if isinstance(value, Exception):
+        return f"-ERR {value}\r\n".encode()
+    data = str(value).encode()
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+def _ok() -> bytes:
+    return b"+OK\r\n"
+
+
+def _live(db: dict, key: str):
+    item = db.get(key)
+    if item is not None and item[1] is not None and item[1] <= time.monotonic():
+        del db[key]
+        return None
+    return item
+
+
+def execute(state: dict, args: list[str]) -> bytes:
+    cmd, rest = args[0].upper(), args[1:]
+    db = _dbs.setdefault(state["db"], {})
+    now = time.monotonic()
+
+    if cmd == "PING":
+        return b"+PONG\r\n"
+    if cmd == "AUTH":
+        return _ok()
+    if cmd == "SELECT":
+        state["db"] = int(rest[0])
+        return _ok()
+    if cmd == "FLUSHDB":
+        db.clear()
+        return _ok()
+    if cmd == "GET":
+        item = _live(db, rest[0])
+        return _encode(item[0] if item else None)
+    if cmd == "SET":
+        key, value, expires_at, nx = rest[0], rest[1], None, False
+        options = [o.upper() for o in rest[2:]]
+        for i, option in enumerate(options):
+            if option == "EX":
+                expires_at = now + int(rest[2 + i + 1])
+            elif option == "PX":
+                expires_at = now + int(rest[2 + i + 1]) / 1000
+            elif option == "NX":
+                nx = True
+        if nx and _live(db, key) is not None:
+            return _encode(None)
+        db[key] = (value, expires_at)
+        return _ok()
+    if cmd in ("INCR", "INCRBY"):
+        key = rest[0]
+        amount = int(rest[1]) if cmd == "INCRBY" else 1
+        item = _live(db, key)
+        try:
+            value = (int(item[0]) if item else 0) + amount
+        except ValueError:
+            return _encode(ValueError("value is not an integer or out of range"))
+        db[key] = (str(value), item[1] if item else None)
+        return _encode(value)
+    if cmd == "PEXPIRE":
+        item = _live(db, rest[0])
+        if item is None:
+            return _encode(0)
+        db[rest[0]] = (item[0], now + int(rest[1]) / 1000)
+        return _encode(1)
+    if cmd == "PTTL":
+        item = _live(db, rest[0])
+        if item is None:
+            return _encode(-2)
+        if item[1] is None:
+            return _encode(-1)
+        return _encode(int((item[1] - now) * 1000))
+    if cmd == "DEL":
+        removed = 0
+        for key in rest:
+            if _live(db, key) is not None:
+                del db[key]
+                removed += 1
+        return _encode(removed)
+    if cmd == "SCAN":
+        # satu putaran penuh: cursor selalu kembali ke 0
+        pattern = "*"
+        upper = [o.upper() for o in rest]
+        if "MATCH" in upper:
+            pattern = rest[upper.index("MATCH") + 1]
+        keys = [k for k in list(db) if _live(db, k) is not None and fnmatch.fnmatchcase(k, pattern)]
+        return _encode(["0", keys])
+    return _encode(ValueError(f"unknown command '{args[0]}'"))
+
+
+async def _read_command(reader: asyncio.StreamReader) -> list[str] | None:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        # inline command (mis. dari `redis-cli` atau telnet)
+        return line.decode().split()
+    args = []
+    for _ in range(int(line[1:-2])):
+        length = int((await reader.readline())[1:-2])
+        args.append((await reader.readexactly(length + 2))[:-2].decode())
+    return args
+
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    state = {"db": 0}
+    try:
+        while True:
+            args = await _read_command(reader)
+            if args is None:
+                break
+            if args:
+                writer.write(execute(state, args))
+                await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(port: int) -> None:
+    server = await asyncio.start_server(handle, "127.0.0.1", port)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    asyncio.run(serve(args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Salinan apa adanya dari middleware BaseHTTPMiddleware di main.py sebelum
+digabung menjadi middleware.SecurityMiddleware. Dipakai sebagai pembanding
+di benchmarks/bench_middleware.py.
+"""
+import logging
+import time
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+logger = logging.getLogger("main")
+
+MAX_BODY_SIZE = 64 * 1024  # 64 KB
+MAX_BATCH_BODY_SIZE = 512 * 1024  # 512 KB
+
+class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        content_length = request.headers.get("content-length")
+        max_size = MAX_BATCH_BODY_SIZE if request.url.path == "/summarize/batch" else MAX_BODY_SIZE
+        if content_length and int(content_length) > max_size:
+            logger.warning(f"[BLOCKED] Oversized request from {request.client.host} — {content_length} bytes")
+            return JSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={"detail": "Request body terlalu besar."},
+            )
+        return await call_next(request)
+
+# ===============================
+# SECURITY: SECURITY HEADERS
+# Tambahkan HTTP security headers standar di setiap response
+# ===============================
+class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
+        response.headers["Content-Security-Policy"] = (
+            "default-src 'self'; "
+            "script-src 'self' 'unsafe-inline'; "
+            "style-src 'self' 'unsafe-inline';"
+        )
+        return response
+
+# ===============================
+# SECURITY: REQUEST LOGGING
+# Log semua request masuk untuk monitoring
+# ===============================
+class RequestLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        duration = round((time.time() - start_time) * 1000, 2)
+        logger.info(
+            f"{request.method} {request.url.path} "
+            f"— IP: {request.client.host} "
+            f"— Status: {response.status_code} "
+            f"— {duration}ms"
+        )
+        return response
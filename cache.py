@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# ─────────────────────────────────────────────
+#  CACHE IN-PROCESS DENGAN TTL + LRU
+# ─────────────────────────────────────────────
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Cache in-memory berukuran tetap. Entry kedaluwarsa setelah `ttl` detik,
+    dan entry yang paling lama tidak dipakai dibuang saat `maxsize` penuh.
+    Aman dipakai dari thread pool maupun event loop.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                value, expires_at = item
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    # antarmuka async yang sama dengan shared_state.SharedTTLCache;
+    # in-memory tidak memblokir, jadi langsung dipanggil
+    async def aget(self, key, default=None):
+        return self.get(key, default)
+
+    async def aset(self, key, value) -> None:
+        self.set(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
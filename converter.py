@@ -1,9 +1,13 @@
 import requests
+import httpx
 import json
 import re
 from urllib.parse import urlparse
 from fastapi import HTTPException
 
+from gql_client import get_client, post_operations
+from shared_state import make_cache
+
 
 # ─────────────────────────────────────────────
 #  HEADERS HTTP
@@ -31,6 +35,27 @@ HEADERS = {
 }
 
 
+# ─────────────────────────────────────────────
+#  CACHE
+#  (shop_domain, product_key) → hasil PDPMainInfo, short link → URL akhir
+#  In-process, atau dibagi antar worker jika SHARED_STATE_URL diset
+# ─────────────────────────────────────────────
+RESOLVE_CACHE_SIZE   = 2048
+RESOLVE_CACHE_TTL    = 6 * 60 * 60   # detik; product_id praktis tidak berubah
+SHORTLINK_CACHE_SIZE = 2048
+SHORTLINK_CACHE_TTL  = 60 * 60       # detik
+
+_resolve_cache   = make_cache("resolve", maxsize=RESOLVE_CACHE_SIZE, ttl=RESOLVE_CACHE_TTL)
+_shortlink_cache = make_cache("shortlink", maxsize=SHORTLINK_CACHE_SIZE, ttl=SHORTLINK_CACHE_TTL)
+
+
+def cache_stats() -> dict:
+    return {
+        "product_resolution": _resolve_cache.stats(),
+        "short_link": _shortlink_cache.stats(),
+    }
+
+
 # ─────────────────────────────────────────────
 #  GRAPHQL QUERY (hanya ambil basicInfo)
 # ─────────────────────────────────────────────
@@ -84,28 +109,10 @@ def parse_tokopedia_url(url: str) -> tuple[str, str] | tuple[None, None]:
 
 
 # ─────────────────────────────────────────────
-#  FETCH PRODUCT ID DARI API
+#  PAYLOAD & PARSING PDPMainInfo
 # ─────────────────────────────────────────────
-def get_product_id(url: str) -> dict | None:
-    """
-    Menerima URL produk Tokopedia, mengembalikan dict berisi:
-      - product_id
-      - shop_id
-      - shop_name
-      - alias
-      - status
-      - product_url
-    """
-    shop_domain, product_key = parse_tokopedia_url(url)
-
-    if not shop_domain or not product_key:
-        print(f"  [ERROR] URL tidak valid: {url}")
-        return None
-
-    print(f"  Shop Domain : {shop_domain}")
-    print(f"  Product Key : {product_key}")
-
-    payload = [
+def build_pdp_payload(shop_domain: str, product_key: str) -> list[dict]:
+    return [
         {
             "operationName": "PDPMainInfo",
             "variables": {
@@ -127,6 +134,50 @@ def get_product_id(url: str) -> dict | None:
         }
     ]
 
+
+def parse_basic_info(operation_result: dict) -> dict:
+    basic_info = (
+        operation_result["data"]["pdpMainInfo"]["data"]["basicInfo"]
+    )
+
+    return {
+        "product_id" : basic_info.get("id", ""),
+        "shop_id"    : basic_info.get("shopID", ""),
+        "shop_name"  : basic_info.get("shopName", ""),
+        "alias"      : basic_info.get("alias", ""),
+        "status"     : basic_info.get("status", ""),
+        "product_url": basic_info.get("url", ""),
+    }
+
+
+# ─────────────────────────────────────────────
+#  FETCH PRODUCT ID DARI API
+# ─────────────────────────────────────────────
+def get_product_id(url: str) -> dict | None:
+    """
+    Menerima URL produk Tokopedia, mengembalikan dict berisi:
+      - product_id
+      - shop_id
+      - shop_name
+      - alias
+      - status
+      - product_url
+    """
+    shop_domain, product_key = parse_tokopedia_url(url)
+
+    if not shop_domain or not product_key:
+        print(f"  [ERROR] URL tidak valid: {url}")
+        return None
+
+    print(f"  Shop Domain : {shop_domain}")
+    print(f"  Product Key : {product_key}")
+
+    cached = _resolve_cache.get((shop_domain, product_key))
+    if cached is not None:
+        return dict(cached)
+
+    payload = build_pdp_payload(shop_domain, product_key)
+
     try:
         response = requests.post(
             "https://gql.tokopedia.com/graphql/PDPMainInfo",
@@ -137,18 +188,9 @@ def get_product_id(url: str) -> dict | None:
         response.raise_for_status()
         data = response.json()
 
-        basic_info = (
-            data[0]["data"]["pdpMainInfo"]["data"]["basicInfo"]
-        )
-
-        return {
-            "product_id" : basic_info.get("id", ""),
-            "shop_id"    : basic_info.get("shopID", ""),
-            "shop_name"  : basic_info.get("shopName", ""),
-            "alias"      : basic_info.get("alias", ""),
-            "status"     : basic_info.get("status", ""),
-            "product_url": basic_info.get("url", ""),
-        }
+        info = parse_basic_info(data[0])
+        _resolve_cache.set((shop_domain, product_key), info)
+        return dict(info)
 
     except requests.exceptions.RequestException as e:
         print(f"  [ERROR] Request gagal: {e}")
@@ -158,6 +200,79 @@ def get_product_id(url: str) -> dict | None:
         return None
 
 
+async def get_product_id_async(url: str) -> dict | None:
+    """
+    Versi async dari get_product_id — memakai client httpx bersama
+    sehingga tidak memblokir event loop.
+    """
+    shop_domain, product_key = parse_tokopedia_url(url)
+
+    if not shop_domain or not product_key:
+        print(f"  [ERROR] URL tidak valid: {url}")
+        return None
+
+    cached = await _resolve_cache.aget((shop_domain, product_key))
+    if cached is not None:
+        return dict(cached)
+
+    try:
+        data = await post_operations(
+            "PDPMainInfo", build_pdp_payload(shop_domain, product_key), HEADERS
+        )
+        info = parse_basic_info(data[0])
+        await _resolve_cache.aset((shop_domain, product_key), info)
+        return dict(info)
+
+    except httpx.HTTPError as e:
+        print(f"  [ERROR] Request gagal: {e}")
+        return None
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        print(f"  [ERROR] Parsing respons gagal: {e}")
+        return None
+
+
+async def get_product_ids_batch_async(urls: list[str]) -> list[dict | None]:
+    """
+    Mode batch: lookup PDPMainInfo untuk banyak URL dalam satu POST.
+    Hasil sesuai urutan `urls`; URL tidak valid / gagal → None.
+    """
+    keys = [parse_tokopedia_url(url) for url in urls]
+    results: list[dict | None] = [None] * len(urls)
+
+    valid = []
+    for i, (shop, key) in enumerate(keys):
+        if not shop or not key:
+            continue
+        cached = await _resolve_cache.aget((shop, key))
+        if cached is not None:
+            results[i] = dict(cached)
+        else:
+            valid.append(i)
+    if not valid:
+        return results
+
+    payload = [build_pdp_payload(*keys[i])[0] for i in valid]
+
+    try:
+        data = await post_operations("PDPMainInfo", payload, HEADERS)
+    except httpx.HTTPError as e:
+        print(f"  [ERROR] Request gagal: {e}")
+        return results
+    except ValueError as e:
+        print(f"  [ERROR] Parsing respons gagal: {e}")
+        return results
+
+    for i, op in zip(valid, data if isinstance(data, list) else []):
+        try:
+            info = parse_basic_info(op)
+            await _resolve_cache.aset(keys[i], info)
+            results[i] = dict(info)
+        except (KeyError, IndexError, TypeError) as e:
+            print(f"  [ERROR] Parsing respons gagal: {e}")
+
+    return results
+
+
 # ─────────────────────────────────────────────
 #  MAIN
 # ─────────────────────────────────────────────
@@ -212,14 +327,18 @@ if __name__ == "__main__":
 def validate_tokopedia_url(url: str):
     try:
         if "tk.tokopedia.com" in url:
-            # Coba HEAD dulu, fallback ke GET kalau gagal
-            try:
-                res = requests.head(url, allow_redirects=True, timeout=10, headers=HEADERS)
-                url = res.url
-            except requests.RequestException:
-                res = requests.get(url, allow_redirects=True, timeout=10, headers=HEADERS, stream=True)
-                url = res.url
-                res.close()
+            short_link = url
+            url = _shortlink_cache.get(short_link)
+            if url is None:
+                # Coba HEAD dulu, fallback ke GET kalau gagal
+                try:
+                    res = requests.head(short_link, allow_redirects=True, timeout=10, headers=HEADERS)
+                    url = res.url
+                except requests.RequestException:
+                    res = requests.get(short_link, allow_redirects=True, timeout=10, headers=HEADERS, stream=True)
+                    url = res.url
+                    res.close()
+                _shortlink_cache.set(short_link, url)
 
         domain = urlparse(url).netloc
 
@@ -239,3 +358,37 @@ def validate_tokopedia_url(url: str):
             detail=f"URL tidak dapat diakses: {str(e)}"
         )
 
+
+async def validate_tokopedia_url_async(url: str):
+    try:
+        if "tk.tokopedia.com" in url:
+            short_link = url
+            url = await _shortlink_cache.aget(short_link)
+            if url is None:
+                # Coba HEAD dulu, fallback ke GET kalau gagal
+                client = get_client()
+                try:
+                    res = await client.head(short_link, follow_redirects=True, timeout=10, headers=HEADERS)
+                    url = str(res.url)
+                except httpx.HTTPError:
+                    async with client.stream("GET", short_link, follow_redirects=True, timeout=10, headers=HEADERS) as res:
+                        url = str(res.url)
+                await _shortlink_cache.aset(short_link, url)
+
+        domain = urlparse(url).netloc
+
+        if "tokopedia.com" not in domain:
+            raise HTTPException(
+                status_code=400,
+                detail="URL harus dari Tokopedia"
+            )
+
+        return url
+
+    except HTTPException:
+        raise  # Re-raise HTTPException agar tidak tertangkap sebagai HTTPError
+    except httpx.HTTPError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"URL tidak dapat diakses: {str(e)}"
+        )
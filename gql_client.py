@@ -0,0 +1,117 @@
+import asyncio
+import os
+import time
+import httpx
+from urllib.parse import urlparse
+
+from metrics import GQL_ERRORS
+
+
+# ─────────────────────────────────────────────
+#  KONFIGURASI
+# ─────────────────────────────────────────────
+GQL_BASE_URL      = os.getenv("GQL_BASE_URL", "https://gql.tokopedia.com/graphql")
+REQUEST_TIMEOUT   = 15.0    # detik, sama dengan versi sync
+MAX_CONNECTIONS   = 20
+MAX_KEEPALIVE     = 10
+KEEPALIVE_EXPIRY  = 60.0    # detik koneksi idle tetap dibuka
+WEB_CONCURRENCY   = int(os.getenv("WEB_CONCURRENCY", 1))      # jumlah worker uvicorn (lihat main.py)
+# budget request per detik per host untuk seluruh server, dibagi rata ke tiap worker
+HOST_RATE_PER_SEC = float(os.getenv("GQL_RATE_PER_SEC", 5.0)) / WEB_CONCURRENCY
+HOST_BURST        = 5       # jumlah request yang boleh langsung jalan sekaligus
+
+
+# ─────────────────────────────────────────────
+#  RATE BUDGET PER HOST (token bucket)
+# ─────────────────────────────────────────────
+class RateLimiter:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+_limiters: dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(url: str) -> RateLimiter:
+    host = urlparse(url).netloc
+    limiter = _limiters.get(host)
+    if limiter is None:
+        limiter = _limiters[host] = RateLimiter(HOST_RATE_PER_SEC, HOST_BURST)
+    return limiter
+
+
+# ─────────────────────────────────────────────
+#  CLIENT BERSAMA (satu pool untuk seluruh proses)
+# ─────────────────────────────────────────────
+_client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Mengembalikan AsyncClient yang dipakai bersama oleh semua request,
+    supaya koneksi TCP/TLS ke gql.tokopedia.com di-reuse (keep-alive).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+async def post_operations(operation_name: str, payload: list[dict], headers: dict) -> list:
+    """
+    POST array operasi GraphQL ke endpoint `operation_name`.
+    Error HTTP / JSON dilempar ke pemanggil (httpx.HTTPError / ValueError).
+    """
+    url = f"{GQL_BASE_URL}/{operation_name}"
+    await get_rate_limiter(url).acquire()
+    try:
+        response = await get_client().post(
+            url,
+            headers=headers,
+            json=payload,
+        )
+        response.raise_for_status()
+    except httpx.HTTPError:
+        GQL_ERRORS.inc(operation=operation_name, kind="http")
+        raise
+
+    try:
+        data = response.json()
+    except ValueError:
+        GQL_ERRORS.inc(operation=operation_name, kind="decode")
+        raise
+
+    if isinstance(data, list):
+        failed = sum(1 for op in data if isinstance(op, dict) and op.get("errors"))
+        if failed:
+            GQL_ERRORS.inc(failed, operation=operation_name, kind="graphql")
+    return data
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import math
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+
+# ─────────────────────────────────────────────
+#  KONFIGURASI
+# ─────────────────────────────────────────────
+JOB_WORKERS       = int(os.getenv("JOB_WORKERS", 2))          # job yang diproses bersamaan
+JOB_QUEUE_SIZE    = int(os.getenv("JOB_QUEUE_SIZE", 50))      # antrean penuh → 503
+JOB_RESULT_TTL    = int(os.getenv("JOB_RESULT_TTL", 60 * 60)) # detik hasil job disimpan setelah selesai
+JOB_DEFAULT_SECS  = 10.0                                      # estimasi durasi job sebelum ada data
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Antrean job penuh")
+        self.retry_after = retry_after
+
+
+# ─────────────────────────────────────────────
+#  ANTREAN JOB + WORKER POOL
+# ─────────────────────────────────────────────
+class JobQueue:
+    """
+    Antrean terbatas yang dikuras oleh `workers` task tetap. submit()
+    langsung mengembalikan job id; status dan hasil diambil lewat get().
+    Job yang sudah selesai disimpan selama `result_ttl` detik.
+
+    Dengan `store` (cache bersama, lihat shared_state), setiap perubahan
+    status juga ditulis ke sana supaya GET /jobs/{id} bisa dijawab worker
+    uvicorn mana pun, bukan hanya worker yang menerima POST /jobs.
+    """
+
+    def __init__(self, handler: Callable[[str], Awaitable[Any]],
+                 workers: int = JOB_WORKERS, maxsize: int = JOB_QUEUE_SIZE,
+                 result_ttl: int = JOB_RESULT_TTL, store=None):
+        self.handler = handler
+        self.store = store
+        self.workers = workers
+        self.maxsize = maxsize
+        self.result_ttl = result_ttl
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._jobs: dict[str, dict] = {}
+        self._running = 0
+        self._avg_secs = JOB_DEFAULT_SECS
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def retry_after(self) -> int:
+        # perkiraan waktu sampai satu slot antrean kosong
+        backlog = self._queue.qsize() if self._queue else 0
+        return max(1, math.ceil(backlog / max(self.workers, 1) * self._avg_secs))
+
+    async def submit(self, payload: str) -> dict:
+        if self._queue is None:
+            raise RuntimeError("JobQueue belum di-start")
+        self._prune()
+
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "queued",
+            "created_at": time.time(),
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        if self._queue.full():
+            self.rejected += 1
+            raise QueueFull(self.retry_after())
+
+        # status "queued" ditulis sebelum masuk antrean, supaya tidak menimpa
+        # "running" dari worker yang mengambil job selama publish berjalan
+        self._jobs[job["job_id"]] = job
+        await self._publish(job)
+        try:
+            self._queue.put_nowait((job, payload))
+        except asyncio.QueueFull:
+            # antrean penuh oleh submit lain selama publish
+            del self._jobs[job["job_id"]]
+            self.rejected += 1
+            raise QueueFull(self.retry_after())
+        return job
+
+    async def get(self, job_id: str) -> dict | None:
+        job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            job = await self.store.aget(job_id)
+        return job
+
+    async def _publish(self, job: dict) -> None:
+        # salinan: worker bisa mengubah job selagi store menulis di thread lain
+        if self.store is not None:
+            await self.store.aset(job["job_id"], dict(job))
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["finished_at"] is not None and job["finished_at"] < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def _worker(self) -> None:
+        while True:
+            job, payload = await self._queue.get()
+            job["status"] = "running"
+            await self._publish(job)
+            self._running += 1
+            start = time.perf_counter()
+            try:
+                job["result"] = await self.handler(payload)
+                job["status"] = "done"
+                self.completed += 1
+            except HTTPException as e:
+                job["status"] = "failed"
+                job["error"] = e.detail
+                self.failed += 1
+            except Exception as e:
+                logger.error(f"Job {job['job_id']} gagal: {e}")
+                job["status"] = "failed"
+                job["error"] = "Terjadi kesalahan internal. Silakan coba lagi."
+                self.failed += 1
+            finally:
+                # rata-rata bergerak durasi job untuk header Retry-After
+                self._avg_secs = 0.8 * self._avg_secs + 0.2 * (time.perf_counter() - start)
+                self._running -= 1
+                job["finished_at"] = time.time()
+                await self._publish(job)
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": self._running,
+            "maxsize": self.maxsize,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_job_secs": round(self._avg_secs, 3),
+        }
@@ -1,25 +1,33 @@
 from fastapi import FastAPI, HTTPException, Request, Form, status
 from fastapi.concurrency import run_in_threadpool
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, PlainTextResponse, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+
+from pydantic import BaseModel
 
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
-
-from scrap_orcess import scrap_orces_reviews_tokopedia
-from scrapper import scrape_all_reviews
-from converter import get_product_id, validate_tokopedia_url
+from slowapi.middleware import SlowAPIASGIMiddleware
+
+from pipeline import get_summary, parse_summary, summary_flight, stream_summary_events, summary_jobs
+from jobs import QueueFull
+from batch import stream_batch_ndjson, BATCH_MAX_URLS
+from scrap_orcess import load_reviews, word_cache_stats, record_word_cache_metrics, shutdown_clean_pool
+from converter import get_product_id_async, validate_tokopedia_url_async, cache_stats
+from gql_client import close_client
+from model_client import close_model_client, breaker as model_breaker
+from metrics import render_metrics
+from middleware import SecurityMiddleware, ThreadedRateLimitMiddleware
+from static_assets import build_assets, AssetFiles, AssetUrls, ASSET_URL_PREFIX, STATIC_BUILD_DIR
+from shared_state import LIMITER_STORAGE_URI, SHARED_STATE_URL, backend as shared_backend, backend_name
+from contextlib import asynccontextmanager
 import uvicorn
-import re
-import httpx
-import time
 import logging
+import os
 
 # ===============================
 # LOGGING
@@ -31,13 +39,33 @@ logger = logging.getLogger(__name__)
 # ===============================
 # RATE LIMITER SETUP
 # ===============================
-limiter = Limiter(key_func=get_remote_address, default_limits=["60/minute"])
+# RATE_LIMIT_ENABLED=0 hanya untuk benchmark beban lokal (benchmarks/bench_load.py)
+# Dengan SHARED_STATE_URL (sqlite:// atau redis://) counter disimpan di backend
+# bersama, jadi batas 60/menit berlaku global, bukan per worker.
+limiter = Limiter(
+    key_func=get_remote_address,
+    default_limits=["60/minute"],
+    storage_uri=LIMITER_STORAGE_URI,
+    enabled=os.getenv("RATE_LIMIT_ENABLED", "1") == "1",
+)
 
 
 # ===============================
 # APP INIT
 # ===============================
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    summary_jobs.start()
+    yield
+    await summary_jobs.stop()
+    # tutup pool koneksi ke gql.tokopedia.com / model server dan process pool saat shutdown
+    await close_client()
+    await close_model_client()
+    shutdown_clean_pool()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     docs_url=None,    # matikan /docs
     redoc_url=None,   # matikan /redoc
     openapi_url=None, # matikan /openapi.json
@@ -48,7 +76,10 @@ app = FastAPI(
 # ===============================
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(SlowAPIASGIMiddleware)
+if shared_backend is not None:
+    # storage rate limit di SQLite/Redis: cek limit jangan memblokir event loop
+    app.add_middleware(ThreadedRateLimitMiddleware)
 
 
 # ===============================
@@ -89,75 +120,25 @@ app.add_middleware(
 
 
 # ===============================
-# SECURITY: REQUEST SIZE LIMIT
-# Tolak body lebih dari 64KB untuk cegah payload flooding
-# ===============================
-MAX_BODY_SIZE = 64 * 1024  # 64 KB
-
-class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        content_length = request.headers.get("content-length")
-        if content_length and int(content_length) > MAX_BODY_SIZE:
-            logger.warning(f"[BLOCKED] Oversized request from {request.client.host} — {content_length} bytes")
-            return JSONResponse(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                content={"detail": "Request body terlalu besar."},
-            )
-        return await call_next(request)
-
-app.add_middleware(RequestSizeLimitMiddleware)
-
-
-# ===============================
-# SECURITY: SECURITY HEADERS
-# Tambahkan HTTP security headers standar di setiap response
-# ===============================
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline'; "
-            "style-src 'self' 'unsafe-inline';"
-        )
-        return response
-
-app.add_middleware(SecurityHeadersMiddleware)
-
-
-# ===============================
-# SECURITY: REQUEST LOGGING
-# Log semua request masuk untuk monitoring
+# SECURITY: REQUEST SIZE LIMIT, SECURITY HEADERS, REQUEST LOGGING
+# Satu middleware ASGI murni (lihat middleware.py): tolak body lebih dari
+# 64KB (termasuk body chunked), tambahkan security headers standar di
+# setiap response, dan log semua request masuk untuk monitoring
 # ===============================
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        duration = round((time.time() - start_time) * 1000, 2)
-        logger.info(
-            f"{request.method} {request.url.path} "
-            f"— IP: {request.client.host} "
-            f"— Status: {response.status_code} "
-            f"— {duration}ms"
-        )
-        return response
-
-app.add_middleware(RequestLoggingMiddleware)
+app.add_middleware(SecurityMiddleware)
 
 
 # ===============================
 # TEMPLATES & STATIC
 # ===============================
+# aset di-build saat start (nama ber-hash + gzip/brotli/WebP) lalu dilayani
+# dari /assets dengan Cache-Control immutable; /static tetap untuk URL lama
+asset_urls = AssetUrls(build_assets())
 templates = Jinja2Templates(directory="templates")
+templates.env.globals.update(asset_url=asset_urls.url, asset_srcset=asset_urls.srcset)
+app.mount(ASSET_URL_PREFIX, AssetFiles(directory=STATIC_BUILD_DIR), name="assets")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-MODEL_API_URL = "https://unfazed-slaw-hydroxide.ngrok-free.dev/summarize"
-
 
 # ===============================
 # ROUTES
@@ -182,85 +163,16 @@ async def summarize(
     product_url: str = Form(...),
 ):
     try:
-        # ===============================
-        # 1. SCRAPING
-        # ===============================
-        url = validate_tokopedia_url(product_url)
-        if not url:
-            raise HTTPException(
-                status_code=400,
-                detail="URL yang anda masukan salah, silakan coba lagi",
-            )
-
-        scrapped_data = await scrap_orces_reviews_tokopedia(url=url)
-        if not scrapped_data:
-            raise HTTPException(
-                status_code=400,
-                detail="⚠️ Gagal melakukan scraping ulasan. Periksa kembali URL produk atau pastikan produk memiliki ulasan",
-            )
-        if scrapped_data["total_reviews"] < 5:
-            raise HTTPException(
-                status_code=400,
-                detail="Produk memiliki terlalu sedikit ulasan, minimal 5 ulasan untuk dirangkum",
-            )
-
-        joined_text = scrapped_data["joined_text"].strip()
-
-        cleaned_text = joined_text.replace(".", "").strip()
-        if not cleaned_text:
-            raise HTTPException(status_code=404, detail="Ulasan kosong")
-
-        logger.info(f"Scraping berhasil — {scrapped_data['total_reviews']} ulasan")
-
-        # ===============================
-        # 2. HIT MODEL SERVER
-        # ===============================
-        async with httpx.AsyncClient(timeout=300) as client:
-            response = await client.post(
-                MODEL_API_URL,
-                json={"text": joined_text},
-            )
-
-        if response.status_code != 200:
-            raise Exception(f"Model error: {response.text}")
-
-        raw_summary = response.json()["summary"].strip()
-
-        # ===============================
-        # 3. PARSING BULLET → UL LI
-        # ===============================
-        parts = re.split(r"\s*•\s*", raw_summary)
-        intro_text = parts[0].strip()
-        bullet_parts = parts[1:] if len(parts) > 1 else []
-
-        html_summary = ""
-
-        if intro_text:
-            intro_text = intro_text[0].upper() + intro_text[1:]
-            html_summary += f"<p>{intro_text}</p>"
-
-        if bullet_parts:
-            html_summary += "<ul>"
-            for item in bullet_parts:
-                match = re.match(r"([^:]+):(.*)", item, re.DOTALL)
-                if match:
-                    title = match.group(1).strip().capitalize()
-                    content = match.group(2).strip()
-                    html_summary += f"<li><b>{title}:</b> {content}</li>"
-                else:
-                    html_summary += f"<li>{item.strip()}</li>"
-            html_summary += "</ul>"
-
-        # ===============================
-        # 4. RENDER HTML
-        # ===============================
+        # scrape → model → render, dilayani dari cache jika tersedia
+        result = await get_summary(product_url)
+
         return templates.TemplateResponse(
             "index.html",
             {
                 "request": request,
-                "original_review": joined_text,
-                "summary": html_summary,
-                "jumlah_ulasan": scrapped_data["total_reviews"],
+                "original_review": result["original_review"],
+                "summary": result["summary_html"],
+                "jumlah_ulasan": result["total_reviews"],
                 "error": None,
                 "product_url": product_url,
             },
@@ -290,19 +202,157 @@ async def summarize(
 
 
 
+@app.post("/summarize/stream")
+@limiter.limit("10/minute")
+async def summarize_stream(
+    request: Request,
+    product_url: str = Form(...),
+):
+    # versi streaming dari /summarize: progress dikirim sebagai server-sent events
+    return StreamingResponse(
+        stream_summary_events(product_url),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # perbandingan weak (RFC 9110): prefiks W/ diabaikan
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+@app.get("/api/summary")
+@limiter.limit("10/minute")
+async def summary_json(request: Request, product_url: str):
+    # ringkasan terstruktur tanpa HTML halaman; ETag = hash set ulasan, jadi
+    # client yang mengirim If-None-Match dapat 304 selama ulasan tidak berubah
+    result = await get_summary(product_url)
+    etag = f'"{result["review_hash"]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    parsed = parse_summary(result["raw_summary"])
+    return JSONResponse(
+        {
+            "product_id": result["product_id"],
+            "intro": parsed["intro"],
+            "bullets": parsed["bullets"],
+            "jumlah_ulasan": result["total_reviews"],
+        },
+        headers=headers,
+    )
+
+
+class BatchRequest(BaseModel):
+    urls: list[str]
+
+
+@app.post("/summarize/batch")
+@limiter.limit("5/minute")
+async def summarize_batch(request: Request, body: BatchRequest):
+    # satu baris JSON per produk, dikirim begitu produk itu selesai
+    if not body.urls:
+        raise HTTPException(status_code=400, detail="Daftar URL kosong")
+    if len(body.urls) > BATCH_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"Maksimal {BATCH_MAX_URLS} URL per batch")
+
+    return StreamingResponse(
+        stream_batch_ndjson(body.urls),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit("10/minute")
+async def create_job(
+    request: Request,
+    product_url: str = Form(...),
+):
+    # ringkasan dikerjakan di background; hasil diambil lewat GET /jobs/{job_id}
+    try:
+        job = await summary_jobs.submit(product_url)
+    except QueueFull as e:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Server sedang sibuk, silakan coba lagi nanti."},
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "status_url": f"/jobs/{job['job_id']}",
+    }
+
+
+@app.get("/jobs/{job_id}")
+@limiter.limit("60/minute")
+async def get_job(request: Request, job_id: str):
+    job = await summary_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan")
+
+    body = {"job_id": job["job_id"], "status": job["status"]}
+    if job["status"] == "done":
+        result = job["result"]
+        body.update({
+            "summary": result["summary_html"],
+            "jumlah_ulasan": result["total_reviews"],
+            "original_review": result["original_review"],
+        })
+    elif job["status"] == "failed":
+        body["error"] = job["error"]
+    return body
+
+
+@app.get("/stats")
+@limiter.limit("30/minute")
+async def stats(request: Request):
+    return {
+        "cache": cache_stats(),
+        "summarize_singleflight": summary_flight.stats(),
+        "jobs": summary_jobs.stats(),
+        "model_breaker": model_breaker.stats(),
+        "gibberish_word_cache": word_cache_stats(),
+        # angka di atas per worker; backend menentukan apa yang dibagi antar worker
+        "shared_state": {"backend": backend_name(), "worker_pid": os.getpid()},
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+@limiter.exempt
+async def metrics(request: Request):
+    # format teks Prometheus; nilai per proses worker (+ process pool pembersihannya)
+    record_word_cache_metrics()
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/get_review")
 async def getReview (url_produk : str) :
-    valid_url = validate_tokopedia_url(url=url_produk)
-    graph_id = get_product_id(valid_url)["product_id"]
-    result = scrape_all_reviews(product_id=graph_id,max_reviews=200)
+    valid_url = await validate_tokopedia_url_async(url=url_produk)
+    graph_id = (await get_product_id_async(valid_url))["product_id"]
+    result = await load_reviews(graph_id, max_reviews=200)
     return result
 # ===============================
 # RUN LOCAL
 # ===============================
 if __name__ == "__main__":
+    # satu worker per core: WEB_CONCURRENCY=4 SHARED_STATE_URL=sqlite:///data/shared_state.sqlite3
+    WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+    if WEB_CONCURRENCY > 1 and shared_backend is None:
+        logger.warning(
+            f"{WEB_CONCURRENCY} worker dengan SHARED_STATE_URL={SHARED_STATE_URL}: "
+            "rate limit dan cache resolve dihitung per worker"
+        )
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8001,
-        # workers=2,  # aktifkan ini untuk production (bukan reload mode)
+        workers=WEB_CONCURRENCY,
     )
\ No newline at end of file
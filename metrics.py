@@ -0,0 +1,173 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+
+# ─────────────────────────────────────────────
+#  KONFIGURASI
+# ─────────────────────────────────────────────
+# detik; rentang dari lookup cache (ms) sampai model call yang lambat (menit)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+# ─────────────────────────────────────────────
+#  METRIK (format teks Prometheus)
+# ─────────────────────────────────────────────
+def _label_str(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, doc: str, labels: tuple = ()):
+        self.name = name
+        self.doc = doc
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels[n]) for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = self._values or ({} if self.labels else {(): 0})
+            for key, value in sorted(values.items()):
+                lines.append(f"{self.name}{_label_str(self.labels, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, doc: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # per label: [jumlah per bucket (non-kumulatif) + +Inf, sum]
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[n]) for n in self.labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """with histogram.time(stage="x"): ... — bisa dipakai di kode async."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                bounds = [f"{b:g}" for b in self.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, counts):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{_label_str(self.labels, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_label_str(self.labels, key)} {total:.6f}")
+                lines.append(f"{self.name}_count{_label_str(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, doc: str, labels: tuple = ()):
+        self.name = name
+        self.doc = doc
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def set(self, value: float, **labels) -> None:
+        key = tuple(str(labels[n]) for n in self.labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_str(self.labels, key)} {value:g}")
+        return lines
+
+
+REGISTRY: list = []
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ─────────────────────────────────────────────
+#  METRIK APLIKASI
+# ─────────────────────────────────────────────
+STAGE_SECONDS = Histogram(
+    "summarize_stage_seconds",
+    "Durasi tiap tahap pipeline /summarize",
+    labels=("stage",),
+)
+SUMMARY_CACHE_LOOKUPS = Counter(
+    "summary_cache_lookups_total",
+    "Lookup cache ringkasan menurut hasil (fresh, stale, miss)",
+    labels=("result",),
+)
+GQL_ERRORS = Counter(
+    "gql_errors_total",
+    "Error dari GraphQL Tokopedia menurut operasi dan jenis (http, decode, graphql)",
+    labels=("operation", "kind"),
+)
+REVIEW_PAGES_FETCHED = Counter(
+    "review_pages_fetched_total",
+    "Halaman ulasan yang berhasil diambil dari GraphQL",
+)
+REVIEWS_CLEANED = Counter(
+    "reviews_cleaned_total",
+    "Ulasan yang melewati pembersihan teks",
+)
+REVIEWS_DEDUPLICATED = Counter(
+    "reviews_deduplicated_total",
+    "Ulasan yang dibuang karena duplikat (exact: teks bersih sama, near: MinHash)",
+    labels=("kind",),
+)
+MODEL_CALLS = Counter(
+    "model_calls_total",
+    "Model call menurut hasil (ok, client_error, server_error, timeout, connect_error, circuit_open)",
+    labels=("outcome",),
+)
+MODEL_CALL_SECONDS = Histogram(
+    "model_call_seconds",
+    "Durasi satu model call (termasuk retry)",
+)
+WORD_CACHE_LOOKUPS = Counter(
+    "word_verdict_cache_lookups_total",
+    "Lookup cache verdict kata gibberish (hit, miss), worker web + process pool pembersihan",
+    labels=("result",),
+)
+WORD_CACHE_SIZE = Gauge(
+    "word_verdict_cache_size",
+    "Jumlah entry cache verdict kata (web: proses worker, pool: total semua proses anak)",
+    labels=("process",),
+)
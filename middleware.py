@@ -0,0 +1,178 @@
+import json
+import logging
+import time
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.middleware import _find_route_handler, _get_route_name
+
+logger = logging.getLogger("main")
+
+
+# ─────────────────────────────────────────────
+#  KONFIGURASI
+# ─────────────────────────────────────────────
+MAX_BODY_SIZE = 64 * 1024  # 64 KB
+MAX_BATCH_BODY_SIZE = 512 * 1024  # 512 KB, /summarize/batch memuat sampai ratusan URL
+LARGE_BODY_PATHS = {"/summarize/batch"}
+
+SECURITY_HEADERS = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    (b"permissions-policy", b"geolocation=(), microphone=(), camera=()"),
+    (b"content-security-policy", b"default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline';"),
+]
+
+_TOO_LARGE_BODY = json.dumps({"detail": "Request body terlalu besar."}).encode()
+
+
+# ─────────────────────────────────────────────
+#  MIDDLEWARE ASGI TUNGGAL
+# ─────────────────────────────────────────────
+class SecurityMiddleware:
+    """
+    Pengganti RequestSizeLimit-, SecurityHeaders- dan RequestLoggingMiddleware
+    dalam satu lapisan ASGI murni (tanpa BaseHTTPMiddleware, jadi tanpa task
+    tambahan dan response streaming tidak di-buffer):
+
+    - body > batas ditolak 413, baik dari Content-Length maupun saat body
+      chunked dibaca melebihi batas;
+    - security headers ditambahkan ke setiap response;
+    - satu baris log per request dengan status dan durasi.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        path = scope["path"]
+        max_size = MAX_BATCH_BODY_SIZE if path in LARGE_BODY_PATHS else MAX_BODY_SIZE
+        client = scope.get("client")
+        client_host = client[0] if client else "-"
+        status_code = 500
+        response_started = False
+        rejected = False
+
+        async def send_with_headers(message):
+            nonlocal status_code, response_started
+            if rejected:
+                # 413 sudah dikirim; response dari app dibuang
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + SECURITY_HEADERS
+            await send(message)
+
+        async def reject_too_large(size):
+            logger.warning(f"[BLOCKED] Oversized request from {client_host} — {size} bytes")
+            await send_with_headers({
+                "type": "http.response.start",
+                "status": 413,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(_TOO_LARGE_BODY)).encode()),
+                ],
+            })
+            await send_with_headers({"type": "http.response.body", "body": _TOO_LARGE_BODY})
+
+        try:
+            content_length = None
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    content_length = value
+                    break
+
+            if content_length is not None and int(content_length) > max_size:
+                await reject_too_large(int(content_length))
+                return
+
+            received = 0
+
+            async def receive_limited():
+                # body tanpa Content-Length (chunked) dihitung saat dibaca;
+                # begitu lewat batas, kirim 413 dan app melihat client putus
+                nonlocal received, rejected
+                if rejected:
+                    return {"type": "http.disconnect"}
+                message = await receive()
+                if message["type"] == "http.request":
+                    received += len(message.get("body", b""))
+                    if received > max_size:
+                        if not response_started:
+                            await reject_too_large(received)
+                        rejected = True
+                        return {"type": "http.disconnect"}
+                return message
+
+            try:
+                await self.app(scope, receive_limited, send_with_headers)
+            except Exception:
+                # error app akibat body yang diputus (ClientDisconnect, dsb.)
+                # setelah 413 terkirim tidak perlu diteruskan ke server
+                if not rejected:
+                    raise
+        finally:
+            duration = round((time.perf_counter() - start) * 1000, 2)
+            logger.info(
+                f"{scope['method']} {path} "
+                f"— IP: {client_host} "
+                f"— Status: {status_code} "
+                f"— {duration}ms"
+            )
+
+
+# ─────────────────────────────────────────────
+#  RATE LIMIT DI THREAD POOL (backend state bersama)
+# ─────────────────────────────────────────────
+class ThreadedRateLimitMiddleware:
+    """
+    Cek slowapi (limiter._check_request_limit) dijalankan di thread pool.
+    Dengan SHARED_STATE_URL sqlite:// / redis:// setiap cek adalah I/O
+    blocking ke storage; SlowAPIASGIMiddleware dan dekorator @limiter.limit
+    memanggilnya langsung di event loop. Dipasang di luar
+    SlowAPIASGIMiddleware: setelah cek di sini request ditandai
+    `_rate_limiting_complete`, jadi middleware dan dekorator slowapi
+    melewatinya.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        app = scope.get("app")
+        limiter = getattr(getattr(app, "state", None), "limiter", None)
+        if scope["type"] != "http" or limiter is None or not limiter.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        handler = _find_route_handler(app.routes, scope)
+        if handler is None or _get_route_name(handler) in limiter._exempt_routes:
+            await self.app(scope, receive, send)
+            return
+
+        # route ber-dekorator memakai limit route-nya, selain itu default_limits
+        name = _get_route_name(handler)
+        decorated = name in limiter._route_limits or name in limiter._dynamic_route_limits
+        request = Request(scope, receive=receive)
+        try:
+            await run_in_threadpool(limiter._check_request_limit, request, handler, not decorated)
+        except RateLimitExceeded as exc:
+            exception_handler = app.exception_handlers.get(RateLimitExceeded, _rate_limit_exceeded_handler)
+            response = exception_handler(request, exc)
+            if hasattr(response, "__await__"):
+                response = await response
+            await response(scope, receive, send)
+            return
+
+        request.state._rate_limiting_complete = True
+        await self.app(scope, receive, send)
@@ -0,0 +1,229 @@
+import asyncio
+import importlib.util
+import logging
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+
+from metrics import MODEL_CALLS, MODEL_CALL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+# ─────────────────────────────────────────────
+#  KONFIGURASI
+# ─────────────────────────────────────────────
+MODEL_API_URL          = os.getenv("MODEL_API_URL", "https://unfazed-slaw-hydroxide.ngrok-free.dev/summarize")
+MODEL_HTTP2            = os.getenv("MODEL_HTTP2", "0") == "1"      # butuh paket h2 (httpx[http2])
+MODEL_CONNECT_TIMEOUT  = float(os.getenv("MODEL_CONNECT_TIMEOUT", 10))
+MODEL_READ_TIMEOUT     = float(os.getenv("MODEL_READ_TIMEOUT", 120))  # jeda maksimum antar byte dari model
+MODEL_WRITE_TIMEOUT    = 30.0
+MODEL_POOL_TIMEOUT     = 30.0    # menunggu koneksi kosong di pool
+MODEL_MAX_CONNECTIONS  = 10
+MODEL_MAX_KEEPALIVE    = 5
+MODEL_KEEPALIVE_EXPIRY = 30.0
+MODEL_MAX_RETRIES      = int(os.getenv("MODEL_MAX_RETRIES", 2))  # retry tambahan untuk 5xx / gagal konek
+MODEL_RETRY_BASE       = 0.5     # detik, backoff eksponensial dengan full jitter
+MODEL_RETRY_CAP        = 8.0
+BREAKER_THRESHOLD      = int(os.getenv("MODEL_BREAKER_THRESHOLD", 5))     # kegagalan beruntun → open
+BREAKER_RESET_AFTER    = float(os.getenv("MODEL_BREAKER_RESET_AFTER", 30)) # detik sebelum coba lagi
+
+# error koneksi yang aman di-retry: request belum/tidak diproses model
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+
+
+class ModelError(Exception):
+    def __init__(self, status_code: int, body: str):
+        super().__init__(f"Model error: {body}")
+        self.status_code = status_code
+
+
+class ModelUnavailable(Exception):
+    """Circuit breaker sedang open — request tidak dikirim sama sekali."""
+
+
+# ─────────────────────────────────────────────
+#  CIRCUIT BREAKER
+# ─────────────────────────────────────────────
+class CircuitBreaker:
+    """
+    closed → (threshold kegagalan beruntun) → open → (reset_after detik)
+    → half_open: satu request percobaan dilewatkan; sukses menutup
+    kembali, gagal membuka lagi.
+    """
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, reset_after: float = BREAKER_RESET_AFTER):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """Lempar ModelUnavailable jika ditolak; True jika ini request percobaan half_open."""
+        state = self.state
+        if state == "closed":
+            return False
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        raise ModelUnavailable("Model server sedang tidak tersedia")
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.threshold:
+            if self.opened_at is None:
+                logger.warning(f"Circuit breaker model open setelah {self.failures} kegagalan")
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self) -> None:
+        # percobaan half_open batal (mis. client putus) tanpa hasil
+        self._probing = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected,
+        }
+
+
+breaker = CircuitBreaker()
+
+
+# ─────────────────────────────────────────────
+#  CLIENT BERSAMA KE MODEL SERVER
+# ─────────────────────────────────────────────
+_client: httpx.AsyncClient | None = None
+
+
+def _http2_enabled() -> bool:
+    if not MODEL_HTTP2:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("MODEL_HTTP2=1 tapi paket h2 tidak terpasang, memakai HTTP/1.1")
+        return False
+    return True
+
+
+def get_model_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=_http2_enabled(),
+            timeout=httpx.Timeout(
+                connect=MODEL_CONNECT_TIMEOUT,
+                read=MODEL_READ_TIMEOUT,
+                write=MODEL_WRITE_TIMEOUT,
+                pool=MODEL_POOL_TIMEOUT,
+            ),
+            limits=httpx.Limits(
+                max_connections=MODEL_MAX_CONNECTIONS,
+                max_keepalive_connections=MODEL_MAX_KEEPALIVE,
+                keepalive_expiry=MODEL_KEEPALIVE_EXPIRY,
+            ),
+        )
+    return _client
+
+
+async def close_model_client() -> None:
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(MODEL_RETRY_CAP, MODEL_RETRY_BASE * 2 ** attempt))
+
+
+async def _send(payload: dict, headers: dict | None, stream: bool) -> httpx.Response:
+    """
+    Kirim request dengan retry (5xx / gagal konek) dan circuit breaker.
+    Response yang dikembalikan selalu 2xx; selain itu ModelError dilempar.
+    """
+    try:
+        probe = breaker.before_call()
+    except ModelUnavailable:
+        MODEL_CALLS.inc(outcome="circuit_open")
+        raise
+
+    client = get_model_client()
+    start = time.perf_counter()
+    try:
+        for attempt in range(MODEL_MAX_RETRIES + 1):
+            try:
+                request = client.build_request("POST", MODEL_API_URL, json=payload, headers=headers)
+                response = await client.send(request, stream=stream)
+            except _RETRYABLE_ERRORS as e:
+                error = e
+            except httpx.HTTPError as e:
+                # read timeout, dsb. — tidak di-retry (model mungkin masih memproses)
+                breaker.record_failure()
+                MODEL_CALLS.inc(outcome="timeout" if isinstance(e, httpx.TimeoutException) else "error")
+                raise
+            else:
+                if response.status_code < 500:
+                    breaker.record_success()
+                    if response.status_code >= 300:
+                        body = (await response.aread()).decode(errors="replace")
+                        await response.aclose()
+                        MODEL_CALLS.inc(outcome="client_error")
+                        raise ModelError(response.status_code, body)
+                    MODEL_CALLS.inc(outcome="ok")
+                    return response
+                body = (await response.aread()).decode(errors="replace")
+                await response.aclose()
+                error = ModelError(response.status_code, body)
+
+            if attempt < MODEL_MAX_RETRIES:
+                delay = _backoff(attempt)
+                logger.warning(f"Model request gagal ({error}), retry {attempt + 1} dalam {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+        breaker.record_failure()
+        MODEL_CALLS.inc(outcome="server_error" if isinstance(error, ModelError) else "connect_error")
+        raise error
+    finally:
+        # hanya pemegang percobaan yang boleh melepasnya: request lama yang
+        # masih berjalan sejak closed tidak boleh membuka slot probe kedua
+        if probe:
+            breaker.release()
+        MODEL_CALL_SECONDS.observe(time.perf_counter() - start)
+
+
+async def post_json(payload: dict) -> dict:
+    response = await _send(payload, None, stream=False)
+    return response.json()
+
+
+@asynccontextmanager
+async def stream(payload: dict, headers: dict | None = None):
+    """Response 2xx yang body-nya dibaca bertahap (aiter_lines / aread)."""
+    response = await _send(payload, headers, stream=True)
+    try:
+        yield response
+    except httpx.HTTPError:
+        breaker.record_failure()
+        raise
+    finally:
+        await response.aclose()
@@ -0,0 +1,108 @@
+import os
+import random
+import zlib
+from collections import defaultdict
+
+
+# ─────────────────────────────────────────────
+#  KONFIGURASI
+# ─────────────────────────────────────────────
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", 0.7))  # Jaccard kata minimum; 0 = mati
+NUM_PERM   = 64     # panjang signature MinHash
+LSH_BANDS  = 16     # 16 band × 4 baris → peluang jadi kandidat ~99% di Jaccard 0.7
+_PRIME     = (1 << 61) - 1
+# kata yang membalik makna kata sesudahnya: "sesuai" vs "tidak sesuai"
+NEGATIONS  = frozenset({
+    "tidak", "tak", "bukan", "belum", "kurang", "jangan",
+    "gak", "ga", "nggak", "enggak", "ngga", "gk", "tdk", "blm",
+})
+
+_rng = random.Random(20240601)
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+# ─────────────────────────────────────────────
+#  MINHASH + LSH
+# ─────────────────────────────────────────────
+def _word_hashes(word: str) -> tuple[int, ...]:
+    h = zlib.crc32(word.encode("utf-8"))
+    return tuple((a * h + b) % _PRIME for a, b in _PERMS)
+
+
+def _signature(words: set[str], vectors: dict) -> tuple[int, ...]:
+    # vektor hash per kata dihitung sekali per kata unik, signature = min per kolom
+    if not words:
+        return (0,) * NUM_PERM
+    rows = []
+    for w in words:
+        vec = vectors.get(w)
+        if vec is None:
+            vec = vectors[w] = _word_hashes(w)
+        rows.append(vec)
+    return tuple(map(min, zip(*rows)))
+
+
+def _negated(words: list[str]) -> frozenset[str]:
+    # kata yang didahului negasi; ulasan dengan himpunan berbeda tidak digabung
+    return frozenset(w for prev, w in zip(words, words[1:]) if prev in NEGATIONS)
+
+
+def _jaccard(a: set[str], b: set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def cluster_near_duplicates(texts: list[str], threshold: float = NEAR_DUP_THRESHOLD) -> list[tuple[int, int]]:
+    """
+    Kelompokkan ulasan yang hampir sama (Jaccard himpunan kata >= threshold).
+    Kandidat dicari dengan MinHash LSH lalu diverifikasi dengan Jaccard asli.
+    Pasangan yang berbeda negasinya ("sesuai" vs "tidak sesuai") tidak
+    digabung berapa pun Jaccard-nya, karena maknanya berlawanan.
+    Return [(index perwakilan, ukuran cluster)] sesuai urutan kemunculan;
+    perwakilan adalah anggota cluster yang paling awal.
+    """
+    n = len(texts)
+    if not threshold or n < 2:
+        return [(i, 1) for i in range(n)]
+
+    tokens    = [t.split() for t in texts]
+    word_sets = [set(words) for words in tokens]
+    negated   = [_negated(words) for words in tokens]
+    rows = NUM_PERM // LSH_BANDS
+
+    buckets = defaultdict(list)
+    vectors: dict[str, tuple[int, ...]] = {}
+    for i, words in enumerate(word_sets):
+        sig = _signature(words, vectors)
+        for band in range(LSH_BANDS):
+            buckets[(band, sig[band * rows:(band + 1) * rows])].append(i)
+
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    checked = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                i, j = members[x], members[y]
+                if (i, j) in checked:
+                    continue
+                checked.add((i, j))
+                ri, rj = find(i), find(j)
+                if (ri != rj and negated[i] == negated[j]
+                        and _jaccard(word_sets[i], word_sets[j]) >= threshold):
+                    # root selalu index terkecil → perwakilan = kemunculan pertama
+                    parent[max(ri, rj)] = min(ri, rj)
+
+    sizes = defaultdict(int)
+    for i in range(n):
+        sizes[find(i)] += 1
+    return [(i, sizes[i]) for i in range(n) if find(i) == i]
@@ -0,0 +1,472 @@
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from scrap_orcess import scrap_orces_reviews_tokopedia
+from converter import get_product_id_async, validate_tokopedia_url_async
+from summary_cache import SummaryCache
+from singleflight import SingleFlight
+from jobs import JobQueue, JOB_WORKERS, JOB_RESULT_TTL
+from metrics import STAGE_SECONDS, SUMMARY_CACHE_LOOKUPS
+import model_client
+import shared_state
+from contextlib import nullcontext
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+MODEL_CONCURRENCY = int(os.getenv("MODEL_CONCURRENCY", JOB_WORKERS))  # model call bersamaan maksimum
+MAP_REDUCE_THRESHOLD = int(os.getenv("MAP_REDUCE_THRESHOLD", 4000))  # karakter; di atas ini pakai map-reduce, 0 = mati
+MAP_CHUNK_CHARS = int(os.getenv("MAP_CHUNK_CHARS", 2000))            # ukuran teks per model call tahap map
+INFLIGHT_TTL = int(os.getenv("INFLIGHT_TTL", 300))   # detik; marker build antar worker kedaluwarsa jika worker mati
+INFLIGHT_POLL = 0.5                                   # detik antar cek summary_cache saat worker lain membangun
+
+# semua jalur (/summarize, streaming, refresh, job) berbagi slot model yang sama
+_model_slots = asyncio.Semaphore(MODEL_CONCURRENCY)
+
+summary_cache = SummaryCache()
+
+# request bersamaan untuk product_id yang sama berbagi satu scrape + model call
+summary_flight = SingleFlight()
+
+# task refresh yang sedang berjalan (product_id → Task), supaya satu produk
+# tidak di-refresh berkali-kali dan task tidak di-garbage-collect
+_refresh_tasks: dict[str, asyncio.Task] = {}
+
+
+# ===============================
+# 1. URL → PRODUCT ID
+# ===============================
+async def resolve_product(product_url: str) -> tuple[str, str]:
+    with STAGE_SECONDS.time(stage="redirect"):
+        url = await validate_tokopedia_url_async(product_url)
+    if not url:
+        raise HTTPException(
+            status_code=400,
+            detail="URL yang anda masukan salah, silakan coba lagi",
+        )
+
+    with STAGE_SECONDS.time(stage="product_lookup"):
+        product = await get_product_id_async(url)
+    if not product or not product.get("product_id"):
+        raise HTTPException(
+            status_code=400,
+            detail="⚠️ Gagal melakukan scraping ulasan. Periksa kembali URL produk atau pastikan produk memiliki ulasan",
+        )
+
+    return url, product["product_id"]
+
+
+# ===============================
+# 2. SCRAPING
+# ===============================
+async def scrape_reviews(url: str, product_id: str, progress=None) -> dict:
+    scrapped_data = await scrap_orces_reviews_tokopedia(url=url, graph_id=product_id, progress=progress)
+    if not scrapped_data:
+        raise HTTPException(
+            status_code=400,
+            detail="⚠️ Gagal melakukan scraping ulasan. Periksa kembali URL produk atau pastikan produk memiliki ulasan",
+        )
+    if scrapped_data["total_reviews"] < 5:
+        raise HTTPException(
+            status_code=400,
+            detail="Produk memiliki terlalu sedikit ulasan, minimal 5 ulasan untuk dirangkum",
+        )
+
+    joined_text = scrapped_data["joined_text"].strip()
+
+    cleaned_text = joined_text.replace(".", "").strip()
+    if not cleaned_text:
+        raise HTTPException(status_code=404, detail="Ulasan kosong")
+
+    scrapped_data["joined_text"] = joined_text
+    logger.info(f"Scraping berhasil — {scrapped_data['total_reviews']} ulasan")
+    return scrapped_data
+
+
+# ===============================
+# 3. HIT MODEL SERVER
+# ===============================
+MODEL_UNAVAILABLE_DETAIL = "Server AI sedang tidak tersedia, silakan coba beberapa saat lagi."
+
+
+async def call_model(joined_text: str) -> str:
+    try:
+        async with _model_slots:
+            data = await model_client.post_json({"text": joined_text})
+    except model_client.ModelUnavailable:
+        raise HTTPException(status_code=503, detail=MODEL_UNAVAILABLE_DETAIL)
+
+    return data["summary"].strip()
+
+
+async def call_model_stream(joined_text: str):
+    """
+    Async generator potongan ringkasan. Jika model server menjawab dengan
+    text/event-stream, setiap baris `data:` diteruskan begitu tiba; jika
+    tidak, seluruh ringkasan JSON dikembalikan sebagai satu potongan.
+    """
+    try:
+        async with _model_slots, model_client.stream(
+            {"text": joined_text, "stream": True},
+            headers={"Accept": "text/event-stream, application/json"},
+        ) as response:
+            if not response.headers.get("content-type", "").startswith("text/event-stream"):
+                yield json.loads(await response.aread())["summary"]
+                return
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                chunk = line[5:]
+                if chunk.startswith(" "):
+                    chunk = chunk[1:]
+                if chunk == "[DONE]":
+                    break
+                yield chunk
+    except model_client.ModelUnavailable:
+        raise HTTPException(status_code=503, detail=MODEL_UNAVAILABLE_DETAIL)
+
+
+# ===============================
+# 3b. MAP-REDUCE UNTUK ULASAN BANYAK
+# ===============================
+def chunk_reviews(reviews: list[str], chunk_chars: int = MAP_CHUNK_CHARS) -> list[str]:
+    """
+    Bagi ulasan terpilih menjadi teks ±chunk_chars karakter tanpa memotong
+    ulasan. Return [] jika total teks di bawah MAP_REDUCE_THRESHOLD.
+    """
+    total = sum(len(r) + 2 for r in reviews)
+    if not MAP_REDUCE_THRESHOLD or total <= MAP_REDUCE_THRESHOLD:
+        return []
+
+    # bagi rata supaya potongan terakhir tidak jauh lebih pendek
+    n_chunks = -(-total // chunk_chars)
+    target = total / n_chunks
+
+    chunks, current, size = [], [], 0
+    for review in reviews:
+        if current and size + len(review) + 2 > target:
+            chunks.append(". ".join(current) + ".")
+            current, size = [], 0
+        current.append(review)
+        size += len(review) + 2
+    if current:
+        chunks.append(". ".join(current) + ".")
+    return chunks
+
+
+def merge_partial_summaries(partials: list[str]) -> str:
+    """
+    Gabungkan ringkasan parsial tanpa model: intro pertama dipakai, bullet
+    dengan judul yang sama digabung. Dipakai jika output reduce dari model
+    tidak berformat bullet. Parsing lewat parse_summary, jadi judul yang
+    dinormalisasi dan bullet tanpa judul (None) sama dengan yang di-render.
+    """
+    intro = ""
+    merged: dict[str | None, list[str]] = {}
+    for partial in partials:
+        parsed = parse_summary(partial)
+        intro = intro or parsed["intro"]
+        for bullet in parsed["bullets"]:
+            # judul kosong (" : isi") diperlakukan sama dengan tanpa judul
+            title, content = bullet["title"] or None, bullet["content"]
+            if not content and title is None:
+                continue
+            contents = merged.setdefault(title, [])
+            if content not in contents:
+                contents.append(content)
+
+    out = intro
+    for title, contents in merged.items():
+        if title is None:
+            # bullet tanpa judul tidak digabung: isinya bisa memuat ":" yang
+            # akan terbaca sebagai judul setelah disambung dengan "; "
+            out += "".join(f" • {content}" for content in contents)
+        else:
+            out += f" • {title}: {'; '.join(contents)}"
+    return out.strip()
+
+
+async def summarize_reviews(scrapped_data: dict, progress=None) -> str:
+    """
+    Ringkas hasil scraping. Teks pendek → satu model call. Teks panjang →
+    map: tiap potongan diringkas bersamaan, lalu reduce: ringkasan parsial
+    diringkas sekali lagi. Dengan `progress`, call terakhir di-stream.
+    """
+    text = scrapped_data["joined_text"]
+    partials = []
+    chunks = chunk_reviews(scrapped_data.get("reviews", []))
+    if len(chunks) > 1:
+        if progress:
+            progress("map", {"chunks": len(chunks)})
+        with STAGE_SECONDS.time(stage="model_map"):
+            partials = await asyncio.gather(*(call_model(chunk) for chunk in chunks))
+        text = ". ".join(p.rstrip(". ") for p in partials) + "."
+
+    with STAGE_SECONDS.time(stage="model"):
+        if progress:
+            progress("model", {"reviews": scrapped_data.get("selected_reviews", scrapped_data["total_reviews"])})
+            parts = []
+            async for chunk in call_model_stream(text):
+                parts.append(chunk)
+                progress("summary_chunk", {"text": chunk})
+            raw_summary = "".join(parts).strip()
+        else:
+            raw_summary = await call_model(text)
+
+    if partials and "•" not in raw_summary:
+        logger.warning("Output reduce tidak berformat bullet, memakai gabungan ringkasan parsial")
+        raw_summary = merge_partial_summaries(partials)
+    return raw_summary
+
+
+# ===============================
+# 4. PARSING BULLET → UL LI
+# ===============================
+def parse_summary(raw_summary: str) -> dict:
+    """
+    Output model "intro • Judul: isi • ..." → {"intro", "bullets": [{title, content}]}.
+    Bullet tanpa "Judul:" mendapat title None.
+    """
+    parts = re.split(r"\s*•\s*", raw_summary)
+    intro_text = parts[0].strip()
+    if intro_text:
+        intro_text = intro_text[0].upper() + intro_text[1:]
+
+    bullets = []
+    for item in parts[1:]:
+        match = re.match(r"([^:]+):(.*)", item, re.DOTALL)
+        if match:
+            bullets.append({"title": match.group(1).strip().capitalize(), "content": match.group(2).strip()})
+        else:
+            bullets.append({"title": None, "content": item.strip()})
+
+    return {"intro": intro_text, "bullets": bullets}
+
+
+def render_summary_html(raw_summary: str) -> str:
+    parsed = parse_summary(raw_summary)
+    html_summary = ""
+
+    if parsed["intro"]:
+        html_summary += f"<p>{parsed['intro']}</p>"
+
+    if parsed["bullets"]:
+        html_summary += "<ul>"
+        for bullet in parsed["bullets"]:
+            if bullet["title"] is not None:
+                html_summary += f"<li><b>{bullet['title']}:</b> {bullet['content']}</li>"
+            else:
+                html_summary += f"<li>{bullet['content']}</li>"
+        html_summary += "</ul>"
+
+    return html_summary
+
+
+# ===============================
+# PIPELINE LENGKAP + CACHE
+# ===============================
+class StageLimits:
+    """
+    Batas concurrency per tahap (resolve URL, scraping, model) untuk
+    pemanggil yang memproses banyak produk sekaligus, mis. batch.
+    """
+
+    def __init__(self, resolve: int, scrape: int, model: int):
+        self.resolve = asyncio.Semaphore(resolve)
+        self.scrape = asyncio.Semaphore(scrape)
+        self.model = asyncio.Semaphore(model)
+
+
+def _stage(limits: StageLimits | None, name: str):
+    return getattr(limits, name) if limits else nullcontext()
+
+
+async def build_summary(url: str, product_id: str, progress=None, limits: StageLimits | None = None) -> dict:
+    """
+    Scrape → model → render, lalu simpan ke cache. Dengan `progress`,
+    setiap tahap dilaporkan dan output model di-stream per potongan.
+    """
+    async with _stage(limits, "scrape"):
+        scrapped_data = await scrape_reviews(url, product_id, progress)
+    async with _stage(limits, "model"):
+        raw_summary = await summarize_reviews(scrapped_data, progress)
+    entry = {
+        "product_id": product_id,
+        "summary_html": render_summary_html(raw_summary),
+        "raw_summary": raw_summary,
+        "original_review": scrapped_data["joined_text"],
+        "total_reviews": scrapped_data["total_reviews"],
+        "review_hash": scrapped_data["review_hash"],
+    }
+    await run_in_threadpool(summary_cache.set, **entry)
+    return entry
+
+
+async def build_summary_once(url: str, product_id: str, progress=None, limits: StageLimits | None = None) -> dict:
+    """
+    build_summary yang dikoordinasikan antar worker uvicorn lewat marker
+    in-flight di shared_state: worker yang memegang marker membangun,
+    worker lain menunggu sampai ringkasannya muncul di summary_cache (yang
+    sudah dibagi lewat file SQLite). Jika pemegang marker gagal, marker
+    dilepas dan penunggu berikutnya mengambil alih.
+    """
+    key = f"summary:{product_id}"
+    token = f"{os.getpid()}:{uuid.uuid4().hex}"
+    announced = False
+    while True:
+        if await run_in_threadpool(shared_state.acquire_marker, key, token, INFLIGHT_TTL):
+            try:
+                return await build_summary(url, product_id, progress, limits)
+            finally:
+                await run_in_threadpool(shared_state.release_marker, key, token)
+
+        if progress and not announced:
+            progress("waiting", {"product_id": product_id})
+            announced = True
+        await asyncio.sleep(INFLIGHT_POLL)
+        cached = await run_in_threadpool(summary_cache.get, product_id)
+        if cached is not None:
+            return cached
+
+
+async def _refresh(url: str, product_id: str, cached: dict) -> None:
+    key = f"refresh:{product_id}"
+    token = f"{os.getpid()}:{uuid.uuid4().hex}"
+    try:
+        if not await run_in_threadpool(shared_state.acquire_marker, key, token, INFLIGHT_TTL):
+            return  # worker lain sedang me-refresh produk ini
+        scrapped_data = await scrape_reviews(url, product_id)
+        if scrapped_data["review_hash"] == cached["review_hash"]:
+            # ulasan tidak berubah → ringkasan lama masih valid
+            await run_in_threadpool(summary_cache.touch, product_id)
+            return
+
+        raw_summary = await summarize_reviews(scrapped_data)
+        await run_in_threadpool(
+            summary_cache.set,
+            product_id=product_id,
+            summary_html=render_summary_html(raw_summary),
+            raw_summary=raw_summary,
+            original_review=scrapped_data["joined_text"],
+            total_reviews=scrapped_data["total_reviews"],
+            review_hash=scrapped_data["review_hash"],
+        )
+        logger.info(f"Cache ringkasan diperbarui — product_id {product_id}")
+    except Exception as e:
+        logger.error(f"Refresh cache gagal untuk product_id {product_id}: {e}")
+    finally:
+        await run_in_threadpool(shared_state.release_marker, key, token)
+        _refresh_tasks.pop(product_id, None)
+
+
+def schedule_refresh(url: str, product_id: str, cached: dict) -> None:
+    if product_id in _refresh_tasks:
+        return
+    _refresh_tasks[product_id] = asyncio.create_task(_refresh(url, product_id, cached))
+
+
+async def get_summary(product_url: str, progress=None, limits: StageLimits | None = None) -> dict:
+    """
+    Entry fresh langsung dikembalikan. Entry stale juga langsung dikembalikan,
+    sementara refresh berjalan di background. Tanpa entry → pipeline penuh.
+    """
+    start = time.perf_counter()
+    async with _stage(limits, "resolve"):
+        url, product_id = await resolve_product(product_url)
+    if progress:
+        progress("resolved", {"product_id": product_id})
+
+    with STAGE_SECONDS.time(stage="cache_lookup"):
+        cached = await run_in_threadpool(summary_cache.get, product_id)
+    if cached is not None:
+        SUMMARY_CACHE_LOOKUPS.inc(result="fresh" if cached["is_fresh"] else "stale")
+        if not cached["is_fresh"]:
+            schedule_refresh(url, product_id, cached)
+        return cached
+    SUMMARY_CACHE_LOOKUPS.inc(result="miss")
+
+    if progress and product_id in summary_flight:
+        progress("waiting", {"product_id": product_id})
+
+    result = await summary_flight.do(product_id, lambda: build_summary_once(url, product_id, progress, limits))
+    # total hanya untuk cache miss: resolve → scrape → model → simpan
+    STAGE_SECONDS.observe(time.perf_counter() - start, stage="total")
+    return result
+
+
+# antrean job ringkasan: POST /jobs → job id, dikerjakan JOB_WORKERS worker
+summary_jobs = JobQueue(get_summary, store=shared_state.shared_cache("jobs", JOB_RESULT_TTL))
+
+
+# ===============================
+# STREAMING (SERVER-SENT EVENTS)
+# ===============================
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _log_abandoned_summary(task: asyncio.Task) -> None:
+    # membaca exception supaya asyncio tidak melaporkan
+    # "Task exception was never retrieved"
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None and not isinstance(error, HTTPException):
+        logger.error(f"Ringkasan gagal setelah client stream putus: {error}")
+
+
+async def stream_summary_events(product_url: str):
+    """
+    Jalankan get_summary dan kirim progress-nya sebagai SSE:
+    start → resolved → page* → cleaned → map? → model → summary_chunk* → done | error.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def progress(event: str, data: dict) -> None:
+        queue.put_nowait((event, data))
+
+    task = asyncio.create_task(get_summary(product_url, progress))
+    getter = None
+    try:
+        yield _sse("start", {})
+
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield _sse(*getter.result())
+                continue
+            break
+
+        while not queue.empty():
+            yield _sse(*queue.get_nowait())
+    finally:
+        if getter is not None:
+            getter.cancel()
+        if not task.done():
+            # client putus: build tetap jalan supaya hasilnya masuk cache,
+            # tapi tidak ada lagi yang membaca hasil/error-nya di sini
+            task.add_done_callback(_log_abandoned_summary)
+
+    try:
+        result = task.result()
+    except HTTPException as e:
+        yield _sse("error", {"detail": e.detail})
+        return
+    except Exception as e:
+        logger.error(f"Unhandled error: {e}")
+        yield _sse("error", {"detail": "Terjadi kesalahan internal. Silakan coba lagi."})
+        return
+
+    yield _sse("done", {
+        "summary": result["summary_html"],
+        "jumlah_ulasan": result["total_reviews"],
+        "original_review": result["original_review"],
+    })
@@ -0,0 +1,163 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from scrapper import MAX_REVIEW_AGE, save_to_csv
+
+
+# ─────────────────────────────────────────────
+#  KONFIGURASI
+# ─────────────────────────────────────────────
+REVIEW_STORE_PATH = os.getenv("REVIEW_STORE_PATH", "data/reviews.sqlite3")
+
+FIELDS = ["feedback_id", "variant", "message", "rating",
+          "created_timestamp", "created_at", "user_name", "is_anonymous"]
+
+
+# ─────────────────────────────────────────────
+#  PENYIMPANAN ULASAN PER PRODUK (SQLite)
+# ─────────────────────────────────────────────
+class ReviewStore:
+    """
+    Riwayat ulasan per produk, unik per feedback_id. Urutan baris (seq)
+    mengikuti urutan kronologis, jadi `load` mengembalikan ulasan terbaru
+    lebih dulu — sama seperti urutan `time desc` dari API.
+
+    Riwayat baru boleh diperbarui inkremental setelah satu scrape penuh
+    selesai tanpa halaman gagal (is_complete); sebelum itu riwayatnya bisa
+    bolong dan harus di-scrape penuh lagi.
+    """
+
+    def __init__(self, path: str = REVIEW_STORE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS reviews (
+                    seq               INTEGER PRIMARY KEY AUTOINCREMENT,
+                    product_id        TEXT NOT NULL,
+                    feedback_id       TEXT NOT NULL,
+                    variant           TEXT,
+                    message           TEXT,
+                    rating            INTEGER,
+                    created_timestamp TEXT,
+                    user_name         TEXT,
+                    is_anonymous      INTEGER,
+                    first_seen        REAL NOT NULL,
+                    created_at        REAL,
+                    UNIQUE (product_id, feedback_id)
+                )
+                """
+            )
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(reviews)")}
+            if "created_at" not in columns:
+                # database lama: baris tanpa created_at memakai first_seen
+                conn.execute("ALTER TABLE reviews ADD COLUMN created_at REAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS scrape_state (
+                    product_id     TEXT PRIMARY KEY,
+                    full_scrape_at REAL NOT NULL
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def known_ids(self, product_id: str) -> set[str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT feedback_id FROM reviews WHERE product_id = ?", (product_id,)
+            ).fetchall()
+        return {row["feedback_id"] for row in rows}
+
+    def is_complete(self, product_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM scrape_state WHERE product_id = ?", (product_id,)
+            ).fetchone()
+        return row is not None
+
+    def mark_incomplete(self, product_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM scrape_state WHERE product_id = ?", (product_id,))
+
+    @staticmethod
+    def _insert(conn, product_id: str, reviews: list[dict]) -> None:
+        now = time.time()
+        rows = [
+            (product_id, str(r["feedback_id"]), r["variant"], r["message"], r["rating"],
+             r["created_timestamp"], r.get("created_at", now), r["user_name"],
+             int(bool(r["is_anonymous"])), now)
+            for r in reversed(reviews)
+        ]
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO reviews
+                (product_id, feedback_id, variant, message, rating,
+                 created_timestamp, created_at, user_name, is_anonymous, first_seen)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+
+    def add_reviews(self, product_id: str, reviews: list[dict]) -> int:
+        """
+        `reviews` terurut terbaru lebih dulu (hasil scraping). Disimpan dari
+        yang paling lama supaya seq tetap kronologis. Return jumlah baris baru.
+        """
+        with self._connect() as conn:
+            before = conn.total_changes
+            self._insert(conn, product_id, reviews)
+            return conn.total_changes - before
+
+    def replace_reviews(self, product_id: str, reviews: list[dict]) -> None:
+        """
+        Hasil scrape penuh yang selesai menggantikan riwayat lama (urutan seq
+        ikut diperbaiki jika sebelumnya bolong) dan produk ditandai lengkap.
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM reviews WHERE product_id = ?", (product_id,))
+            self._insert(conn, product_id, reviews)
+            conn.execute(
+                "INSERT OR REPLACE INTO scrape_state (product_id, full_scrape_at) VALUES (?, ?)",
+                (product_id, time.time()),
+            )
+
+    def load(self, product_id: str, limit: int | None = None) -> list[dict]:
+        """
+        Ulasan terbaru lebih dulu, hanya yang masih dalam MAX_REVIEW_AGE.
+        Satu-satunya tempat jendela umur diterapkan, jadi scrape penuh dan
+        refresh inkremental mengembalikan set ulasan yang sama.
+        """
+        query = (
+            "SELECT * FROM reviews WHERE product_id = ? AND COALESCE(created_at, first_seen) >= ? "
+            "ORDER BY seq DESC"
+        )
+        params: tuple = (product_id, time.time() - MAX_REVIEW_AGE)
+        if limit:
+            query += " LIMIT ?"
+            params += (limit,)
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [
+            {**{field: row[field] for field in FIELDS},
+             "is_anonymous": bool(row["is_anonymous"])}
+            for row in rows
+        ]
+
+    def export_csv(self, product_id: str, filename: str) -> None:
+        save_to_csv(self.load(product_id), filename)
@@ -1,147 +1,606 @@
 
 from fastapi import HTTPException
-from scrapper import scrape_all_reviews
-from converter import get_product_id
+from fastapi.concurrency import run_in_threadpool
+from scrapper import scrape_all_reviews_checked_async, scrape_new_reviews_async
+from converter import get_product_id_async
+from review_store import ReviewStore
+from near_dup import cluster_near_duplicates
+from selection import select_reviews
+from metrics import STAGE_SECONDS, REVIEWS_CLEANED, REVIEWS_DEDUPLICATED, WORD_CACHE_LOOKUPS, WORD_CACHE_SIZE
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import defaultdict
+from functools import lru_cache
+import asyncio
+import bisect
 import emoji
+import hashlib
+import logging
+import os
 import re
+import threading
+
+logger = logging.getLogger(__name__)
 
       
+_NON_ALPHA = re.compile(r'[^a-zA-Z]')
+_VOWELS = "aiueo"
+_CONSONANT_RUN: dict[int, re.Pattern] = {}
+
+# cache verdict per kata, dipakai bersama lintas ulasan & request
+WORD_VERDICT_CACHE_SIZE = 65536
+
+
+def _consonant_run_pattern(max_consonant_run: int) -> re.Pattern:
+    pattern = _CONSONANT_RUN.get(max_consonant_run)
+    if pattern is None:
+        pattern = _CONSONANT_RUN[max_consonant_run] = re.compile(
+            rf'[bcdfghjklmnpqrstvwxyz]{{{max_consonant_run},}}'
+        )
+    return pattern
+
+
+@lru_cache(maxsize=WORD_VERDICT_CACHE_SIZE)
+def _keep_word(w, min_word_len, unique_ratio_threshold, min_vowel_ratio, max_consonant_run) -> bool:
+    # normalisasi huruf
+    word = _NON_ALPHA.sub('', w.lower())
+
+    # kalau kosong setelah dibersihkan
+    if not word:
+        return False
+
+    # kata pendek biasanya masih valid (misal: "oke", "bagus")
+    if len(word) < min_word_len:
+        return True
+
+    # 1️⃣ rasio karakter unik
+    unique_ratio = len(set(word)) / len(word)
+    if unique_ratio < unique_ratio_threshold:
+        return False
+
+    # 2️⃣ harus ada vokal, 3️⃣ rasio vokal
+    vowels = sum(word.count(v) for v in _VOWELS)
+    if not vowels or vowels / len(word) < min_vowel_ratio:
+        return False
+
+    # 4️⃣ terlalu banyak konsonan beruntun
+    return not _consonant_run_pattern(max_consonant_run).search(word)
+
+
+def classify_words(words, min_word_len=5, unique_ratio_threshold=0.5,
+                   min_vowel_ratio=0.2, max_consonant_run=5) -> dict[str, bool]:
+    """Verdict (True = dipertahankan) untuk setiap kata unik dalam `words`."""
+    return {
+        w: _keep_word(w, min_word_len, unique_ratio_threshold, min_vowel_ratio, max_consonant_run)
+        for w in set(words)
+    }
+
+
+def word_cache_stats() -> dict:
+    info = _keep_word.cache_info()
+    total = info.hits + info.misses
+    return {
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": round(info.hits / total, 4) if total else 0.0,
+    }
+
+
+_word_cache_lock = threading.Lock()
+_word_cache_reported = [0, 0]    # hits, misses yang sudah dilaporkan dari proses ini
+
+
+def _word_cache_delta() -> tuple[int, int, int]:
+    """(hits, misses) baru sejak panggilan sebelumnya di proses ini, dan ukuran cache."""
+    with _word_cache_lock:
+        info = _keep_word.cache_info()
+        hits = info.hits - _word_cache_reported[0]
+        misses = info.misses - _word_cache_reported[1]
+        _word_cache_reported[:] = [info.hits, info.misses]
+    return hits, misses, info.currsize
+
+
+def _record_word_cache(hits: int, misses: int) -> None:
+    WORD_CACHE_LOOKUPS.inc(hits, result="hit")
+    WORD_CACHE_LOOKUPS.inc(misses, result="miss")
+
+
+def record_word_cache_metrics() -> None:
+    """
+    Masukkan lookup cache verdict kata proses ini ke metrik (dipanggil
+    sebelum render /metrics). Lookup di proses anak pool dilaporkan oleh
+    clean_reviews dari hasil tiap potongan.
+    """
+    hits, misses, size = _word_cache_delta()
+    _record_word_cache(hits, misses)
+    WORD_CACHE_SIZE.set(size, process="web")
+
+
 def remove_gibberish(text, min_word_len=5, unique_ratio_threshold=0.5,
                      min_vowel_ratio=0.2, max_consonant_run=5):
 
     if not isinstance(text, str):
         return ""
 
-    words = text.split()
-    clean_words = []
-
-    for w in words:
-        # normalisasi huruf
-        word = re.sub(r'[^a-zA-Z]', '', w.lower())
-
-        # kalau kosong setelah dibersihkan
-        if not word:
+    params = (min_word_len, unique_ratio_threshold, min_vowel_ratio, max_consonant_run)
+    return " ".join(w for w in text.split() if _keep_word(w, *params))
+
+
+def remove_gibberish_batch(texts, min_word_len=5, unique_ratio_threshold=0.5,
+                           min_vowel_ratio=0.2, max_consonant_run=5) -> list[str]:
+    """
+    remove_gibberish untuk banyak teks sekaligus: kata unik dari seluruh
+    teks diklasifikasi sekali, lalu tiap teks disaring dengan hasil itu.
+    """
+    split = [t.split() if isinstance(t, str) else [] for t in texts]
+    verdict = classify_words(
+        (w for words in split for w in words),
+        min_word_len, unique_ratio_threshold, min_vowel_ratio, max_consonant_run,
+    )
+    return [" ".join(w for w in words if verdict[w]) for words in split]
+
+# teks pendek diproses dengan scan langsung (biayanya kecil dan terbatas);
+# di atas batas ini square dicari lewat posisi kemunculan kata berikutnya,
+# dan tabel square O(n log n) baru dibangun jika pencarian itu terlalu mahal
+REPEAT_SCAN_MAX_WORDS = 64
+REPEAT_LAZY_BUDGET    = 8       # × jumlah kata: batas kerja tiap tahap pencarian sebelum naik tahap
+
+
+def _z_function(s: list[int]) -> list[int]:
+    n = len(s)
+    z = [0] * n
+    l = r = 0
+    for i in range(1, n):
+        if i < r:
+            z[i] = min(r - i, z[i - l])
+        while i + z[i] < n and s[z[i]] == s[i + z[i]]:
+            z[i] += 1
+        if i + z[i] > r:
+            l, r = i, i + z[i]
+    return z
+
+
+def _find_squares(s: list[int], shift: int, out: list) -> None:
+    """
+    Main–Lorentz: kumpulkan semua square (frasa yang langsung diulang,
+    s[p:p+l] == s[p+l:p+2l]) sebagai grup (p_awal, p_akhir, l).
+    Jumlah grup O(n log n) walaupun jumlah square bisa O(n²).
+    """
+    n = len(s)
+    if n == 1:
+        return
+    nu = n // 2
+    nv = n - nu
+    u, v = s[:nu], s[nu:]
+    ru, rv = u[::-1], v[::-1]
+
+    _find_squares(u, shift, out)
+    _find_squares(v, shift + nu, out)
+
+    z1 = _z_function(ru)
+    z2 = _z_function(v + [-1] + u)
+    z3 = _z_function(ru + [-1] + rv)
+    z4 = _z_function(v)
+
+    def get_z(z, i):
+        return z[i] if 0 <= i < len(z) else 0
+
+    for cntr in range(n):
+        left = cntr < nu
+        if left:
+            l = nu - cntr
+            k1 = get_z(z1, nu - cntr)
+            k2 = get_z(z2, nv + 1 + cntr)
+        else:
+            l = cntr - nu + 1
+            k1 = get_z(z3, nu + 1 + nv - 1 - (cntr - nu))
+            k2 = get_z(z4, (cntr - nu) + 1)
+
+        if k1 + k2 < l:
             continue
 
-        # kata pendek biasanya masih valid (misal: "oke", "bagus")
-        if len(word) < min_word_len:
-            clean_words.append(w)
+        lo = max(1, l - k2)
+        hi = min(l, k1)
+        if left:
+            hi = min(hi, l - 1)
+        if lo > hi:
             continue
 
-        # 1️⃣ rasio karakter unik
-        unique_ratio = len(set(word)) / len(word)
-        if unique_ratio < unique_ratio_threshold:
-            continue
+        # posisi awal square berurutan untuk l1 = lo..hi
+        if left:
+            out.append((shift + cntr - hi, shift + cntr - lo, l))
+        else:
+            out.append((shift + cntr - l - hi + 1, shift + cntr - l - lo + 1, l))
+
+
+def _shortest_squares(ids: list[int], min_len: int) -> list[int]:
+    """Untuk tiap posisi i: panjang frasa terpendek (>= min_len) yang langsung diulang di i, atau 0."""
+    n = len(ids)
+    groups = []
+    if n > 1:
+        _find_squares(ids, 0, groups)
+
+    shortest = [0] * n
+    # next_free[i] → posisi berikutnya (>= i) yang belum terisi (union-find)
+    next_free = list(range(n + 1))
+
+    def find(i):
+        root = i
+        while next_free[root] != root:
+            root = next_free[root]
+        while next_free[i] != root:
+            next_free[i], i = root, next_free[i]
+        return root
+
+    for start, end, l in sorted((g for g in groups if g[2] >= min_len), key=lambda g: g[2]):
+        i = find(start)
+        while i <= end:
+            shortest[i] = l
+            next_free[i] = i + 1
+            i = find(i + 1)
+    return shortest
+
+
+def _next_square(words: list[str], i: int, min_len: int, budget: list[int],
+                 occurrences: dict | None = None) -> int | None:
+    """
+    Panjang frasa terpendek (>= min_len) yang langsung diulang di i, atau 0.
+    Square berukuran s di i mensyaratkan words[i + s] == words[i], jadi
+    kandidat hanya kemunculan kata words[i] berikutnya, dicek dari yang
+    terdekat: lewat list.index, atau lewat `occurrences` (kata → posisi
+    terurut) jika sudah dibangun. None jika `budget` habis.
+    """
+    word = words[i]
+    lo, hi = i + min_len, (len(words) + i) // 2 + 1   # j = i + s dengan s >= min_len, i + 2s <= n
+    if occurrences is not None:
+        positions = occurrences[word]
+        k = bisect.bisect_left(positions, lo)
+        end = len(positions)
+    j = lo
+    while budget[0] >= 0:
+        if occurrences is None:
+            try:
+                found = words.index(word, j, hi)
+            except ValueError:
+                budget[0] -= hi - j
+                break
+            budget[0] -= found - j + 1
+            j = found + 1
+        elif k < end and positions[k] < hi:
+            found = positions[k]
+            budget[0] -= 1
+            k += 1
+        else:
+            break
+        size = found - i
+        if words[found - 1] == words[found + size - 1]:
+            # slice + bandingkan berjalan di C, jauh lebih murah per kata
+            # daripada satu langkah loop Python
+            budget[0] -= size // 16
+            if words[i:found] == words[found:found + size]:
+                return size
+    return 0 if budget[0] >= 0 else None
+
+
+def _remove_repeated_phrases_scan(words: list[str], min_phrase_len: int) -> list[str]:
+    n = len(words)
 
-        # 2️⃣ harus ada vokal
-        if not re.search(r'[aiueo]', word):
-            continue
+    result = []
+    i = 0
 
-        # 3️⃣ rasio vokal
-        vowel_ratio = len(re.findall(r'[aiueo]', word)) / len(word)
-        if vowel_ratio < min_vowel_ratio:
-            continue
+    while i < n:
+        found = False
 
-        # 4️⃣ terlalu banyak konsonan beruntun
-        if re.search(rf'[bcdfghjklmnpqrstvwxyz]{{{max_consonant_run},}}', word):
-            continue
+        for size in range(min_phrase_len, (n - i) // 2 + 1):
+            phrase = words[i:i + size]
+
+            repeat = 1
+            while words[i + size * repeat:i + size * (repeat + 1)] == phrase:
+                repeat += 1
+
+            if repeat > 1:
+                result.extend(phrase)
+                i += size * repeat
+                found = True
+                break
 
-        clean_words.append(w)
+        if not found:
+            result.append(words[i])
+            i += 1
+
+    return result
 
-    return " ".join(clean_words)
 
 def remove_repeated_phrases(text, min_phrase_len=2):
+        """
+        Ganti frasa (>= min_phrase_len kata) yang diulang berturut-turut dengan
+        satu salinannya, dari kiri ke kanan dengan frasa terpendek lebih dulu.
+        Teks panjang mencari square lewat kemunculan kata berikutnya (spam
+        copy-paste selesai hampir linear); jika itu terlalu mahal, dipakai
+        tabel square terpendek per posisi (Main–Lorentz, O(n log n)).
+        """
         words = text.split()
         n = len(words)
 
+        if n <= REPEAT_SCAN_MAX_WORDS:
+            return " ".join(_remove_repeated_phrases_scan(words, min_phrase_len))
+
+        # spam copy-paste: square langsung ketemu di kemunculan kata berikutnya
+        # dan seluruh salinan dilompati. Pencarian dibatasi budget; jika habis,
+        # indeks posisi per kata dibangun, dan jika itu pun habis baru tabel
+        # square penuh dipakai untuk sisa teks
+        min_len = max(1, min_phrase_len)
+        budget = [REPEAT_LAZY_BUDGET * n]
+        occurrences = None
+        shortest = None
+
         result = []
         i = 0
 
         while i < n:
-            found = False
-
-            for size in range(min_phrase_len, (n - i) // 2 + 1):
-                phrase = words[i:i + size]
-
-                repeat = 1
-                while words[i + size * repeat:i + size * (repeat + 1)] == phrase:
-                    repeat += 1
-
-                if repeat > 1:
-                    result.extend(phrase)
-                    i += size * repeat
-                    found = True
+            size = None
+            while size is None:
+                if shortest is not None:
+                    size = shortest[i]
                     break
-
-            if not found:
+                size = _next_square(words, i, min_len, budget, occurrences)
+                if size is None:
+                    budget = [REPEAT_LAZY_BUDGET * n]
+                    if occurrences is None:
+                        occurrences = defaultdict(list)
+                        for pos, word in enumerate(words):
+                            occurrences[word].append(pos)
+                    else:
+                        vocab = {}
+                        shortest = _shortest_squares([vocab.setdefault(w, len(vocab)) for w in words], min_len)
+            if size:
+                # lompati semua salinan utuh yang berurutan
+                phrase = words[i:i + size]
+                end = i + size
+                while words[end:end + size] == phrase:
+                    end += size
+                result.extend(phrase)
+                i = end
+            else:
                 result.append(words[i])
                 i += 1
 
         return " ".join(result)
 
-def clean_review_text(text):
-        if not isinstance(text, str):
-            return ""
-
+class ReviewCleaner:
+    """
+    Pipeline clean_review_text dengan pola regex yang dikompilasi sekali.
+    Beberapa langkah digabung tanpa mengubah hasil:
+      - ketawa + keyboard smash → satu alternasi (keduanya mengganti satu kata utuh dengan spasi)
+      - hapus titik + simbol → satu pass (titik termasuk [^a-z\s])
+      - rapikan spasi di akhir tidak perlu: remove_gibberish sudah menyatukan kata dengan satu spasi
+    """
+
+    EMOTICON = re.compile(r"""
+        (?:
+            [:=;][oO\-]?[D\)\]\(\]/\\OpP] |
+            [D\)\]\(\]/\\OpP][oO\-]?[=:;] |
+            <3 |
+            t_t |
+            x_x |
+            xd
+        )
+    """, re.VERBOSE | re.IGNORECASE)
+    NOISE_WORD    = re.compile(r'\b(?:(?:ha|he|hi|ho|hu|wk|kw){2,}|[bcdfghjklmnpqrstvwxyz]{6,})\b')
+    REPEAT_CHAR   = re.compile(r'(.)\1{2,}')
+    GLUED_WORD    = re.compile(r'\b(\w{2,})\1+\b')
+    SYMBOL        = re.compile(r'[^a-z\s]')
+    SINGLE_CHAR   = re.compile(r'\b[a-z]\b')
+    REPEATED_WORD = re.compile(r'\b(\w+)\b(\s+\1){2,}')
+
+    # pemisah antar ulasan saat batch; bukan \w, bukan \s, dan tidak
+    # disentuh langkah 3–7, sehingga batas kata tiap ulasan tetap sama.
+    # Dua karakter berbeda: ulasan yang kosong setelah langkah 3–7 membuat
+    # pemisah berdempetan, dan "\x00\x00\x00" akan dirapatkan REPEAT_CHAR
+    # sedangkan "\x00\x01\x00\x01..." tidak
+    BATCH_SEP = "\x00\x01"
+    # potongan non-ASCII + satu karakter ASCII sebelumnya (basis keycap "1️⃣");
+    # emoji tidak pernah memuat ASCII lain, jadi tokenizer emoji cukup
+    # dijalankan di potongan ini, bukan di seluruh teks
+    NON_ASCII_RUN = re.compile(r'[\x00-\x7f]?[^\x00-\x7f]+')
+
+    def _replace_emoji(self, match: re.Match) -> str:
+        return emoji.replace_emoji(match.group(), replace="")
+
+    def _strip_emoji(self, text: str) -> str:
         # 1. lowercase
         text = text.lower()
 
-        # 2. hapus emoji
-        text = emoji.replace_emoji(text, replace="")
+        # 2. hapus emoji (emoji selalu non-ASCII, jadi teks ASCII dilewati)
+        if not text.isascii():
+            text = self.NON_ASCII_RUN.sub(self._replace_emoji, text)
+        return text
 
+    def _normalize(self, text: str) -> str:
         # 3. hapus emoticon
-        emot_pattern = r"""
-            (?:
-                [:=;][oO\-]?[D\)\]\(\]/\\OpP] |
-                [D\)\]\(\]/\\OpP][oO\-]?[=:;] |
-                <3 |
-                t_t |
-                x_x |
-                xd
-            )
-        """
-        text = re.sub(emot_pattern, "", text, flags=re.VERBOSE | re.IGNORECASE)
-
-        # 4. hapus ketawa
-        laughter_pattern = r'\b(?:ha|he|hi|ho|hu|wk|kw){2,}\b'
-        text = re.sub(laughter_pattern, ' ', text)
+        text = self.EMOTICON.sub("", text)
 
-        # 5. keyboard smash
-        random_word_pattern = r'\b[bcdfghjklmnpqrstvwxyz]{6,}\b'
-        text = re.sub(random_word_pattern, ' ', text)
+        # 4–5. hapus ketawa & keyboard smash
+        text = self.NOISE_WORD.sub(' ', text)
 
         # 6. karakter berlebih
-        text = re.sub(r'(.)\1{2,}', r'\1', text)
+        text = self.REPEAT_CHAR.sub(r'\1', text)
 
         # 7. kata nempel
-        text = re.sub(r'\b(\w{2,})\1+\b', r'\1', text)
-
-        # 8. hapus titik
-        text = text.replace('.', ' ')
+        return self.GLUED_WORD.sub(r'\1', text)
 
-        # 9. simbol
-        text = re.sub(r'[^a-z\s]', ' ', text)
+    def _collapse(self, text: str) -> str:
+        # 8–9. titik & simbol
+        text = self.SYMBOL.sub(' ', text)
 
         # 10. karakter tunggal
-        text = re.sub(r'\b[a-z]\b', ' ', text)
+        text = self.SINGLE_CHAR.sub(' ', text)
 
         # 11. kata berulang
-        text = re.sub(r'\b(\w+)\b(\s+\1){2,}', r'\1', text)
+        text = self.REPEATED_WORD.sub(r'\1', text)
 
-        # 11a. frasa berulang atau kata tak beraturan
-        text = remove_repeated_phrases(text)
-        text = remove_gibberish(text)
+        # 11a. frasa berulang
+        return remove_repeated_phrases(text)
 
-        # 12. rapikan spasi
-        text = re.sub(r'\s+', ' ', text).strip()
+    def _finish(self, text: str) -> str:
+        # 11a. kata tak beraturan (12. spasi ikut rapi)
+        return remove_gibberish(self._collapse(text))
 
-        return text
+    def clean(self, text) -> str:
+        if not isinstance(text, str):
+            return ""
+        return self._finish(self._normalize(self._strip_emoji(text)))
+
+    def clean_batch(self, texts: list) -> list[str]:
+        """
+        Bersihkan banyak ulasan sekaligus. Langkah regex 3–7 dijalankan sekali
+        atas gabungan semua ulasan; emoji dan langkah 8–11 tetap per ulasan,
+        lalu kata unik seluruh batch diklasifikasi gibberish sekali.
+        """
+        results = [""] * len(texts)
+        idx = [i for i, t in enumerate(texts) if isinstance(t, str) and t]
+        if not idx:
+            return results
+        if any("\x00" in texts[i] or "\x01" in texts[i] for i in idx):
+            for i in idx:
+                results[i] = self.clean(texts[i])
+            return results
+
+        # emoji dihapus per ulasan: satu emoji membuat seluruh string gabungan
+        # disimpan 4 byte per karakter. Ulasan yang habis oleh emoji (mis.
+        # "👍👍") membuat pemisah berdempetan, yang tetap utuh melewati langkah
+        # 3–7, jadi jumlah bagian tetap sama dengan idx
+        joined = self._normalize(self.BATCH_SEP.join([self._strip_emoji(texts[i]) for i in idx]))
+        collapsed = [self._collapse(part) if part else "" for part in joined.split(self.BATCH_SEP)]
+        for i, text in zip(idx, remove_gibberish_batch(collapsed)):
+            results[i] = text
+        return results
+
+
+review_cleaner = ReviewCleaner()
+
+
+# ===============================
+# OFFLOAD PEMBERSIHAN KE PROCESS POOL
+# ===============================
+# setiap worker uvicorn punya pool sendiri, jadi core dibagi rata antar worker
+WEB_CONCURRENCY      = int(os.getenv("WEB_CONCURRENCY", 1))
+CLEAN_POOL_WORKERS   = int(os.getenv("CLEAN_POOL_WORKERS", max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)))
+CLEAN_POOL_THRESHOLD = int(os.getenv("CLEAN_POOL_THRESHOLD", 100))  # di bawah ini tetap inline
+CLEAN_CHUNK_SIZE     = int(os.getenv("CLEAN_CHUNK_SIZE", 50))
+
+_clean_pool: ProcessPoolExecutor | None = None
+_pool_cache_sizes: dict[int, int] = {}    # pid proses anak → ukuran cache verdict kata
+
+
+def _get_clean_pool() -> ProcessPoolExecutor:
+    global _clean_pool
+    if _clean_pool is None:
+        _clean_pool = ProcessPoolExecutor(max_workers=CLEAN_POOL_WORKERS)
+    return _clean_pool
+
+
+def shutdown_clean_pool() -> None:
+    if _clean_pool is not None:
+        _drop_clean_pool(_clean_pool)
+
+
+def _clean_chunk(texts: list) -> tuple[list[str], int, tuple[int, int, int]]:
+    # dijalankan di proses anak: statistik cache ikut dikirim balik
+    return review_cleaner.clean_batch(texts), os.getpid(), _word_cache_delta()
+
+
+def _drop_clean_pool(pool: ProcessPoolExecutor) -> None:
+    global _clean_pool
+    if _clean_pool is pool:
+        pool.shutdown(wait=False, cancel_futures=True)
+        _clean_pool = None
+        _pool_cache_sizes.clear()
+        WORD_CACHE_SIZE.set(0, process="pool")
+
+
+async def clean_reviews(texts: list) -> list[str]:
+    """
+    Bersihkan ulasan tanpa membebani event loop: daftar besar dipecah per
+    CLEAN_CHUNK_SIZE ke process pool lalu digabung lagi sesuai urutan.
+    Daftar kecil (< CLEAN_POOL_THRESHOLD) tetap inline karena biaya IPC-nya
+    lebih besar dari pekerjaannya.
+    """
+    if CLEAN_POOL_WORKERS <= 1 or len(texts) < CLEAN_POOL_THRESHOLD:
+        return review_cleaner.clean_batch(texts)
+
+    loop = asyncio.get_running_loop()
+    pool = _get_clean_pool()
+    chunks = [texts[i:i + CLEAN_CHUNK_SIZE] for i in range(0, len(texts), CLEAN_CHUNK_SIZE)]
+    try:
+        parts = await asyncio.gather(
+            *(loop.run_in_executor(pool, _clean_chunk, chunk) for chunk in chunks)
+        )
+    except BrokenProcessPool as e:
+        # proses anak mati (OOM kill dsb.): pool dibuang dan dibuat ulang saat
+        # panggilan berikutnya, request ini dibersihkan di thread pool
+        logger.warning(f"Process pool pembersihan rusak, dibuat ulang: {e}")
+        _drop_clean_pool(pool)
+        return await run_in_threadpool(review_cleaner.clean_batch, texts)
 
-async def scrap_orces_reviews_tokopedia (url:str) -> dict :
+    for _, pid, (hits, misses, size) in parts:
+        _record_word_cache(hits, misses)
+        _pool_cache_sizes[pid] = size
+    WORD_CACHE_SIZE.set(sum(_pool_cache_sizes.values()), process="pool")
+    return [text for part, _, _ in parts for text in part]
+
+
+def clean_review_text(text):
+    return review_cleaner.clean(text)
+
+review_store = ReviewStore()
+
+async def load_reviews(graph_id: str, max_reviews: int = 200, on_page=None) -> list[dict]:
+    """
+    Ambil ulasan lewat review store: produk yang riwayatnya lengkap hanya
+    mengambil halaman baru sampai bertemu feedback_id yang tersimpan.
+    Produk baru, atau yang scrape sebelumnya terputus di tengah, di-scrape
+    penuh lagi sampai sekali selesai tanpa halaman gagal. Hasil selalu
+    dibaca dari store.
+    """
+    known_ids = await run_in_threadpool(review_store.known_ids, graph_id)
+    complete = bool(known_ids) and await run_in_threadpool(review_store.is_complete, graph_id)
+
+    if complete:
+        fresh, complete = await scrape_new_reviews_async(graph_id, known_ids, max_reviews=max_reviews, on_page=on_page)
+        if fresh:
+            await run_in_threadpool(review_store.add_reviews, graph_id, fresh)
+        if not complete:
+            await run_in_threadpool(review_store.mark_incomplete, graph_id)
+    else:
+        fresh, complete = await scrape_all_reviews_checked_async(graph_id, max_reviews=max_reviews, on_page=on_page)
+        if complete:
+            await run_in_threadpool(review_store.replace_reviews, graph_id, fresh)
+        elif fresh:
+            await run_in_threadpool(review_store.add_reviews, graph_id, fresh)
+
+    # semua jalur lewat review_store.load (jendela umur yang sama), supaya
+    # set ulasan — dan review_set_hash — tidak bergantung jalur mana yang jalan
+    return await run_in_threadpool(review_store.load, graph_id, max_reviews)
+
+def review_set_hash(reviews: list[str]) -> str:
+    """Hash isi set ulasan bersih — berubah hanya jika ulasannya berubah."""
+    return hashlib.sha256("\n".join(reviews).encode("utf-8")).hexdigest()
+
+async def scrap_orces_reviews_tokopedia (url:str, graph_id: str | None = None, progress=None) -> dict :
     url = url
-    product_id = get_product_id(url)
-    graph_id = product_id["product_id"]
-    reviews = scrape_all_reviews(graph_id,max_reviews=200)
+    if graph_id is None:
+        product_id = await get_product_id_async(url)
+        graph_id = product_id["product_id"]
+    on_page = None
+    if progress:
+        def on_page(page, count, total):
+            progress("page", {"page": page, "reviews": count, "total_reviews": total})
+
+    with STAGE_SECONDS.time(stage="review_pages"):
+        reviews = await load_reviews(graph_id, max_reviews=200, on_page=on_page)
     if reviews is None or len(reviews) < 5 :
         raise HTTPException(
             status_code=500,
@@ -151,28 +610,56 @@ async def scrap_orces_reviews_tokopedia (url:str) -> dict :
     
     seen = set()
     result = []
+    result_meta = []
 
-    for r in reviews_parsed:
-        if not r:
-            continue
-
-        cleaned = clean_review_text(r)
-
+    with STAGE_SECONDS.time(stage="cleaning"):
+        cleaned_reviews = await clean_reviews(reviews_parsed)
+    for review, cleaned in zip(reviews, cleaned_reviews):
         if cleaned and cleaned not in seen :
             seen.add(cleaned)
             result.append(cleaned)
-        
+            result_meta.append(review)
+
+    REVIEWS_CLEANED.inc(len(reviews))
+    REVIEWS_DEDUPLICATED.inc(len(reviews) - len(result), kind="exact")
+    if progress:
+        progress("cleaned", {"reviews": len(reviews), "unique_reviews": len(result)})
+
+    # ===============================
+    # 4a. GABUNG ULASAN HAMPIR SAMA
+    # ===============================
+    with STAGE_SECONDS.time(stage="dedup"):
+        clusters = cluster_near_duplicates(result)
+    representatives = [result[i] for i, _ in clusters]
+    REVIEWS_DEDUPLICATED.inc(len(result) - len(representatives), kind="near")
+
+    # ===============================
+    # 4b. PILIH ULASAN DALAM BUDGET MODEL
+    # ===============================
+    with STAGE_SECONDS.time(stage="selection"):
+        selected = select_reviews(
+            representatives,
+            ratings=[result_meta[i]["rating"] for i, _ in clusters],
+            variants=[result_meta[i]["variant"] for i, _ in clusters],
+            weights=[size for _, size in clusters],
+        )
+
     # ===============================
     # 5. JOIN DENGAN TITIK
     # ===============================
     if len(result) >= 5  : 
-        joined_text = ". ".join(result) + "."
+        joined_text = ". ".join(representatives[i] for i in selected) + "."
     else :
         joined_text = ""
 
     return {
         "total_reviews": len(result),
-        "joined_text": joined_text
+        "joined_text": joined_text,
+        "review_hash": review_set_hash(result),
+        "representative_reviews": len(representatives),
+        "selected_reviews": len(selected),
+        "reviews": [representatives[i] for i in selected],
+        "cluster_sizes": [size for _, size in clusters],
     }
     
 
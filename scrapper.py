@@ -1,8 +1,16 @@
 import requests
+import httpx
+import asyncio
 import json
 import csv
 import time
+import math
 import os
+import re
+from datetime import datetime
+
+from gql_client import post_operations
+from metrics import REVIEW_PAGES_FETCHED
 
 
 # ─────────────────────────────────────────────
@@ -14,6 +22,8 @@ SORT_BY      = "time desc"
 FILTER_BY    = ""
 OUTPUT_FILE  = "reviews_output.csv"
 DELAY_SEC    = 1.0              # jeda antar request (detik) – jangan terlalu cepat
+MAX_CONCURRENCY = 5             # request yang berjalan paralel (versi async)
+BATCH_SIZE   = 5                # halaman per POST pada mode batch
 
 
 # ─────────────────────────────────────────────
@@ -71,23 +81,91 @@ query productReviewList($productID: String!, $page: Int!, $limit: Int!, $sortBy:
 """
 
 
+# ─────────────────────────────────────────────
+#  PAYLOAD & PARSING productReviewList
+# ─────────────────────────────────────────────
+def build_review_operation(product_id: str, page: int, limit: int = 10) -> dict:
+    return {
+        "operationName": "productReviewList",
+        "variables": {
+            "productID": product_id,
+            "page": page,
+            "limit": limit,
+            "sortBy": SORT_BY,
+            "filterBy": FILTER_BY,
+        },
+        "query": GQL_QUERY,
+    }
+
+
+# satuan "N ... lalu" di reviewCreateTimestamp → detik
+RELATIVE_UNITS = {
+    "detik": 1, "menit": 60, "jam": 60 * 60, "hari": 24 * 60 * 60,
+    "minggu": 7 * 24 * 60 * 60, "bulan": 30 * 24 * 60 * 60, "tahun": 365 * 24 * 60 * 60,
+}
+_RELATIVE_TIME = re.compile(r"(\d+)\s*(detik|menit|jam|hari|minggu|bulan|tahun)")
+# jendela umur ulasan (dipakai review_store saat load), selaras dengan kondisi
+# stop "lebih dari 1 tahun": tambahan satu hari supaya "1 tahun lalu" /
+# "12 bulan lalu" yang masih dikembalikan API tidak langsung jatuh di luar
+MAX_REVIEW_AGE = RELATIVE_UNITS["tahun"] + RELATIVE_UNITS["hari"]
+
+
+def review_created_at(r: dict, now: float | None = None) -> float:
+    """
+    Epoch detik ulasan dibuat. reviewCreateTime (ISO 8601 / epoch) dipakai
+    jika terbaca; jika tidak, diperkirakan dari teks relatif
+    reviewCreateTimestamp ("2 minggu lalu") terhadap waktu scraping.
+    """
+    now = time.time() if now is None else now
+    raw = str(r.get("reviewCreateTime") or "").strip()
+    if raw:
+        if raw.isdigit():
+            value = float(raw)
+            return value / 1000 if value > 1e11 else value   # epoch milidetik
+        try:
+            return datetime.fromisoformat(raw.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+
+    relative = r.get("reviewCreateTimestamp", "").lower()
+    if "lebih dari 1 tahun" in relative:
+        return now - MAX_REVIEW_AGE - RELATIVE_UNITS["hari"]
+    match = _RELATIVE_TIME.search(relative)
+    if match:
+        return now - int(match.group(1)) * RELATIVE_UNITS[match.group(2)]
+    return now
+
+
+def parse_review(r: dict) -> dict:
+    return {
+        "feedback_id"       : r.get("id", ""),
+        "variant"           : r.get("variantName", ""),
+        "message"           : r.get("message", "").replace("\n", " "),
+        "rating"            : r.get("productRating", ""),
+        "created_timestamp" : r.get("reviewCreateTimestamp", ""),
+        "created_at"        : review_created_at(r),
+        "user_name"         : r.get("user", {}).get("fullName", ""),
+        "is_anonymous"      : r.get("isAnonymous", False),
+    }
+
+
+def parse_review_page(operation_result: dict) -> dict | None:
+    """Ambil isi productrevGetProductReviewList dari satu elemen respons array."""
+    try:
+        return operation_result["data"]["productrevGetProductReviewList"]
+    except (KeyError, TypeError):
+        return None
+
+
+def is_older_than_one_year(r: dict) -> bool:
+    return "lebih dari 1 tahun" in r.get("reviewCreateTimestamp", "").lower()
+
+
 # ─────────────────────────────────────────────
 #  FUNGSI FETCH SATU HALAMAN
 # ─────────────────────────────────────────────
 def fetch_reviews(product_id: str, page: int, limit: int = 10) -> dict | None:
-    payload = [
-        {
-            "operationName": "productReviewList",
-            "variables": {
-                "productID": product_id,
-                "page": page,
-                "limit": limit,
-                "sortBy": SORT_BY,
-                "filterBy": FILTER_BY,
-            },
-            "query": GQL_QUERY,
-        }
-    ]
+    payload = [build_review_operation(product_id, page, limit)]
 
     try:
         response = requests.post(
@@ -108,6 +186,54 @@ def fetch_reviews(product_id: str, page: int, limit: int = 10) -> dict | None:
         return None
 
 
+async def fetch_reviews_async(product_id: str, page: int, limit: int = 10) -> dict | None:
+    payload = [build_review_operation(product_id, page, limit)]
+
+    try:
+        data = await post_operations("productReviewList", payload, HEADERS)
+        result = data[0]["data"]["productrevGetProductReviewList"]
+        if result is not None:
+            REVIEW_PAGES_FETCHED.inc()
+        return result
+
+    except httpx.HTTPError as e:
+        print(f"  [ERROR] Request gagal pada halaman {page}: {e}")
+        return None
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        print(f"  [ERROR] Parsing respons gagal pada halaman {page}: {e}")
+        return None
+
+
+async def fetch_reviews_batch_async(product_id: str, pages: list[int], limit: int = 10) -> list[dict | None]:
+    """
+    Mode batch: beberapa halaman dikemas dalam satu POST (array operasi),
+    lalu respons array dipecah kembali per halaman sesuai urutan `pages`.
+    Halaman yang gagal menghasilkan None di posisinya.
+
+    PDPMainInfo sengaja tidak ikut dikemas dengan halaman pertama: operasi
+    dalam satu array dijalankan tanpa saling bergantung, sedangkan
+    productReviewList butuh productID yang justru hasil PDPMainInfo.
+    Lookup PDPMainInfo dikemas terpisah (converter.get_product_ids_batch_async).
+    """
+    payload = [build_review_operation(product_id, page, limit) for page in pages]
+
+    try:
+        data = await post_operations("productReviewList", payload, HEADERS)
+    except httpx.HTTPError as e:
+        print(f"  [ERROR] Request gagal pada halaman {pages}: {e}")
+        return [None] * len(pages)
+    except ValueError as e:
+        print(f"  [ERROR] Parsing respons gagal pada halaman {pages}: {e}")
+        return [None] * len(pages)
+
+    if not isinstance(data, list):
+        return [None] * len(pages)
+
+    results = [parse_review_page(op) for op in data[:len(pages)]]
+    REVIEW_PAGES_FETCHED.inc(sum(r is not None for r in results))
+    return results + [None] * (len(pages) - len(results))
+
+
 # ─────────────────────────────────────────────
 #  FUNGSI SCRAPE SEMUA HALAMAN
 # ─────────────────────────────────────────────
@@ -140,19 +266,11 @@ def scrape_all_reviews(product_id: str, limit: int = 10, max_reviews: int = None
 
         for r in reviews:
             # Kondisi stop 1: review lebih dari 1 tahun
-            if "lebih dari 1 tahun" in r.get("reviewCreateTimestamp", "").lower():
+            if is_older_than_one_year(r):
                 print(f"\n  ⛔ Review lebih dari 1 tahun. Scraping dihentikan.")
                 return all_messages
 
-            all_messages.append({
-                "feedback_id"       : r.get("id", ""),
-                "variant"           : r.get("variantName", ""),
-                "message"           : r.get("message", "").replace("\n", " "),
-                "rating"            : r.get("productRating", ""),
-                "created_timestamp" : r.get("reviewCreateTimestamp", ""),
-                "user_name"         : r.get("user", {}).get("fullName", ""),
-                "is_anonymous"      : r.get("isAnonymous", False),
-            })
+            all_messages.append(parse_review(r))
 
             # Kondisi stop 2: sudah capai max_reviews
             if max_reviews and len(all_messages) >= max_reviews:
@@ -170,6 +288,164 @@ def scrape_all_reviews(product_id: str, limit: int = 10, max_reviews: int = None
 
     return all_messages
 
+
+async def scrape_all_reviews_async(product_id: str, limit: int = 10, max_reviews: int = None,
+                                   concurrency: int = MAX_CONCURRENCY,
+                                   batch_size: int = BATCH_SIZE,
+                                   on_page=None) -> list[dict]:
+    reviews, _ = await scrape_all_reviews_checked_async(
+        product_id, limit, max_reviews, concurrency, batch_size, on_page
+    )
+    return reviews
+
+
+async def scrape_all_reviews_checked_async(product_id: str, limit: int = 10, max_reviews: int = None,
+                                           concurrency: int = MAX_CONCURRENCY,
+                                           batch_size: int = BATCH_SIZE,
+                                           on_page=None) -> tuple[list[dict], bool]:
+    """
+    Versi async dari scrape_all_reviews dengan kondisi stop yang sama.
+    Halaman 1 diambil dulu untuk membaca totalReviews, lalu sisa halaman
+    diambil paralel (dibatasi `concurrency` + rate budget per host di
+    gql_client) dan digabung kembali sesuai urutan halaman.
+    Dengan batch_size > 1, setiap POST membawa beberapa halaman sekaligus.
+    `on_page(page, jumlah_ulasan_halaman, total_reviews)` dipanggil setiap
+    kali satu halaman selesai diterima (untuk progress streaming).
+
+    Return (ulasan, lengkap): lengkap False jika berhenti karena halaman
+    gagal diambil, bukan karena salah satu kondisi stop.
+    """
+    all_messages = []
+
+    first = await fetch_reviews_async(product_id, 1, limit)
+    if first is None:
+        return all_messages, False
+
+    # Halaman terakhir yang perlu diambil, dibatasi max_reviews
+    try:
+        last_page = math.ceil(int(first.get("totalReviews")) / limit)
+    except (TypeError, ValueError):
+        last_page = None
+    if last_page is not None and max_reviews:
+        last_page = min(last_page, math.ceil(max_reviews / limit))
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch_page(page: int) -> dict | None:
+        async with semaphore:
+            return await fetch_reviews_async(product_id, page, limit)
+
+    async def fetch_batch(pages: list[int]) -> list[dict | None]:
+        async with semaphore:
+            return await fetch_reviews_batch_async(product_id, pages, limit)
+
+    # page → (task, index hasil di dalam batch)
+    tasks: dict[int, tuple[asyncio.Task, int]] = {}
+    if first.get("hasNext", False) and last_page is not None:
+        remaining = list(range(2, last_page + 1))
+        size = max(1, batch_size)
+        for start in range(0, len(remaining), size):
+            chunk = remaining[start:start + size]
+            if len(chunk) == 1:
+                task = asyncio.create_task(fetch_page(chunk[0]))
+                tasks[chunk[0]] = (task, None)
+            else:
+                task = asyncio.create_task(fetch_batch(chunk))
+                for idx, page in enumerate(chunk):
+                    tasks[page] = (task, idx)
+
+    try:
+        page, result = 1, first
+        while True:
+            reviews  = result.get("list", [])
+            has_next = result.get("hasNext", False)
+
+            if on_page:
+                on_page(page, len(reviews), first.get("totalReviews"))
+
+            if not reviews:
+                break
+
+            for r in reviews:
+                # Kondisi stop 1: review lebih dari 1 tahun
+                if is_older_than_one_year(r):
+                    return all_messages, True
+
+                all_messages.append(parse_review(r))
+
+                # Kondisi stop 2: sudah capai max_reviews
+                if max_reviews and len(all_messages) >= max_reviews:
+                    return all_messages, True
+
+            if not has_next:
+                break
+
+            page += 1
+            if page in tasks:
+                task, idx = tasks[page]
+                result = await task if idx is None else (await task)[idx]
+            else:
+                # totalReviews tidak terbaca atau kurang dari yang sebenarnya
+                # (ulasan baru masuk selama scrape) → lanjut satu per satu
+                # selama hasNext masih true
+                result = await fetch_page(page)
+
+            if result is None:
+                return all_messages, False
+    finally:
+        # Halaman yang tidak lagi dibutuhkan (stop lebih awal) dibatalkan
+        for task, _ in tasks.values():
+            task.cancel()
+
+    return all_messages, True
+
+async def scrape_new_reviews_async(product_id: str, known_ids: set[str], limit: int = 10,
+                                   max_reviews: int = None, on_page=None) -> tuple[list[dict], bool]:
+    """
+    Scrape inkremental: karena urutan `time desc`, halaman diambil satu per
+    satu sampai bertemu feedback_id yang sudah tersimpan. Kondisi stop
+    1 tahun dan max_reviews tetap berlaku. Return (hanya ulasan baru,
+    lengkap); lengkap False jika halaman gagal sebelum bertemu ulasan lama,
+    artinya ada celah antara ulasan baru dan riwayat tersimpan.
+    """
+    new_messages = []
+    page = 1
+
+    while True:
+        result = await fetch_reviews_async(product_id, page, limit)
+
+        if result is None:
+            return new_messages, False
+
+        reviews  = result.get("list", [])
+        has_next = result.get("hasNext", False)
+
+        if on_page:
+            on_page(page, len(reviews), result.get("totalReviews"))
+
+        if not reviews:
+            break
+
+        for r in reviews:
+            if str(r.get("id", "")) in known_ids:
+                return new_messages, True
+
+            if is_older_than_one_year(r):
+                return new_messages, True
+
+            new_messages.append(parse_review(r))
+
+            # belum bertemu ulasan lama → mungkin masih ada celah
+            if max_reviews and len(new_messages) >= max_reviews:
+                return new_messages, False
+
+        if not has_next:
+            break
+
+        page += 1
+
+    return new_messages, True
+
 # ─────────────────────────────────────────────
 #  SIMPAN KE CSV
 # ─────────────────────────────────────────────
@@ -179,7 +455,7 @@ def save_to_csv(reviews: list[dict], filename: str) -> None:
         return
 
     fieldnames = ["feedback_id", "variant", "message", "rating",
-                  "created_timestamp", "user_name", "is_anonymous"]
+                  "created_timestamp", "created_at", "user_name", "is_anonymous"]
 
     with open(filename, "w", newline="", encoding="utf-8-sig") as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
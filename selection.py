@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+
+
+# ─────────────────────────────────────────────
+#  KONFIGURASI
+# ─────────────────────────────────────────────
+MODEL_CHAR_BUDGET = int(os.getenv("MODEL_CHAR_BUDGET", 6000))   # maks karakter teks ke model; 0 = tanpa batas
+SEPARATOR_COST    = 2                                           # ". " di antara ulasan
+
+
+# ─────────────────────────────────────────────
+#  SKOR INFORMATIF (TF-IDF, tervektorisasi)
+# ─────────────────────────────────────────────
+def score_reviews(texts: list[str]) -> np.ndarray:
+    """
+    Skor tiap ulasan = jumlah IDF kata unik di dalamnya. Ulasan yang
+    memuat banyak kata jarang (detail spesifik) mendapat skor tinggi,
+    ulasan generik ("bagus mantap") rendah.
+    """
+    n = len(texts)
+    if n == 0:
+        return np.zeros(0)
+
+    vocab: dict[str, int] = {}
+    doc_ids, term_ids = [], []
+    for d, text in enumerate(texts):
+        for w in set(text.split()):
+            doc_ids.append(d)
+            term_ids.append(vocab.setdefault(w, len(vocab)))
+
+    if not term_ids:
+        return np.zeros(n)
+
+    doc_ids = np.asarray(doc_ids, dtype=np.int64)
+    term_ids = np.asarray(term_ids, dtype=np.int64)
+
+    df = np.bincount(term_ids, minlength=len(vocab))
+    idf = np.log((1 + n) / (1 + df)) + 1.0
+    return np.bincount(doc_ids, weights=idf[term_ids], minlength=n)
+
+
+# ─────────────────────────────────────────────
+#  SELEKSI BERSTRATA DALAM BUDGET
+# ─────────────────────────────────────────────
+def select_reviews(texts: list[str], ratings: list, variants: list,
+                   weights: list[int] | None = None,
+                   budget: int = MODEL_CHAR_BUDGET) -> list[int]:
+    """
+    Pilih subset ulasan yang muat dalam `budget` karakter (setelah digabung
+    dengan ". "). Budget dibagi per strata (rating, varian) sebanding bobotnya
+    — `weights` biasanya ukuran cluster near-duplicate — lalu tiap strata
+    diisi ulasan dengan skor/karakter tertinggi. Sisa budget diisi secara
+    global. Return index terpilih sesuai urutan asli.
+    """
+    n = len(texts)
+    if n == 0:
+        return []
+
+    costs = np.fromiter((len(t) + SEPARATOR_COST for t in texts), dtype=np.int64, count=n)
+    if not budget or costs.sum() <= budget:
+        return list(range(n))
+
+    w = np.ones(n) if weights is None else np.asarray(weights, dtype=np.float64)
+    # skor × log(1 + ukuran cluster), dinormalisasi per karakter
+    value = score_reviews(texts) * np.log1p(w) / np.sqrt(costs)
+    order = np.argsort(-value, kind="stable")
+
+    strata: dict[tuple, list[int]] = {}
+    for i in order.tolist():
+        strata.setdefault((ratings[i], variants[i]), []).append(i)
+
+    keys = list(strata)
+    stratum_weight = np.array([w[strata[k]].sum() for k in keys])
+    quotas = budget * stratum_weight / stratum_weight.sum()
+
+    chosen = np.zeros(n, dtype=bool)
+    used = 0
+    # putaran 1: isi kuota tiap strata, strata terbesar lebih dulu
+    for s in np.argsort(-stratum_weight, kind="stable").tolist():
+        spent = 0
+        for i in strata[keys[s]]:
+            cost = int(costs[i])
+            if used + cost > budget:
+                continue
+            if spent + cost > quotas[s] and spent > 0:
+                break
+            chosen[i] = True
+            spent += cost
+            used += cost
+
+    # putaran 2: sisa budget diisi ulasan bernilai tertinggi yang belum terpilih
+    for i in order.tolist():
+        if not chosen[i] and used + costs[i] <= budget:
+            chosen[i] = True
+            used += int(costs[i])
+
+    return np.flatnonzero(chosen).tolist()
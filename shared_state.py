@@ -0,0 +1,465 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from limits.storage import Storage
+from starlette.concurrency import run_in_threadpool
+
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+# ─────────────────────────────────────────────
+#  KONFIGURASI
+# ─────────────────────────────────────────────
+# memory://                      → state per proses (default, cukup untuk 1 worker)
+# sqlite:///data/shared.sqlite3  → file SQLite bersama semua worker di satu mesin
+# redis://[:password@]host:port/db → server ber-protokol Redis (RESP)
+SHARED_STATE_URL     = os.getenv("SHARED_STATE_URL", "memory://")
+SHARED_STATE_TIMEOUT = float(os.getenv("SHARED_STATE_TIMEOUT", 2.0))  # detik per operasi
+SQLITE_PRUNE_EVERY   = 500    # set() sebelum key kedaluwarsa dibersihkan dari tabel
+
+
+class SharedStateError(Exception):
+    pass
+
+
+# ─────────────────────────────────────────────
+#  BACKEND SQLITE (satu file, banyak proses)
+# ─────────────────────────────────────────────
+class SQLiteBackend:
+    """
+    Key-value dengan TTL di atas satu tabel SQLite (WAL). Operasi atomik
+    (set_nx, incr) memakai satu statement UPSERT, jadi aman dipakai
+    bersamaan oleh beberapa worker uvicorn.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._sets = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS kv (
+                    key        TEXT PRIMARY KEY,
+                    value      NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=SHARED_STATE_TIMEOUT)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM kv WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value, ttl: float) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+        self._sets += 1
+        if self._sets % SQLITE_PRUNE_EVERY == 0:
+            self.prune()
+
+    def set_nx(self, key: str, value, ttl: float) -> bool:
+        """Set hanya jika key belum ada (atau sudah kedaluwarsa). True jika berhasil."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at
+                WHERE kv.expires_at <= ?
+                """,
+                (key, value, now + ttl, now),
+            )
+        return cursor.rowcount == 1
+
+    def incr(self, key: str, amount: int, ttl: float) -> int:
+        """Tambah counter; TTL hanya dipasang saat counter baru dibuat."""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                """
+                INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    value      = CASE WHEN kv.expires_at <= ? THEN excluded.value
+                                      ELSE kv.value + excluded.value END,
+                    expires_at = CASE WHEN kv.expires_at <= ? THEN excluded.expires_at
+                                      ELSE kv.expires_at END
+                RETURNING value
+                """,
+                (key, amount, now + ttl, now, now),
+            ).fetchone()
+        return int(row[0])
+
+    def ttl(self, key: str) -> float | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT expires_at FROM kv WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        remaining = row[0] - time.time()
+        return remaining if remaining > 0 else None
+
+    def delete(self, key: str, value=None) -> None:
+        """Hapus key; dengan `value`, hanya jika isinya masih sama (marker milik sendiri)."""
+        with self._connect() as conn:
+            if value is None:
+                conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+            else:
+                conn.execute("DELETE FROM kv WHERE key = ? AND value = ?", (key, value))
+
+    def clear(self, prefix: str) -> int:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM kv WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            )
+        return cursor.rowcount
+
+    def prune(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM kv WHERE expires_at <= ?", (time.time(),))
+
+    def ping(self) -> bool:
+        with self._connect() as conn:
+            conn.execute("SELECT 1")
+        return True
+
+
+# ─────────────────────────────────────────────
+#  BACKEND RESP (Redis / server kompatibel)
+# ─────────────────────────────────────────────
+class RespBackend:
+    """
+    Klien RESP minimal (tanpa dependensi redis-py) untuk perintah yang
+    dipakai di sini: GET, SET EX/NX, INCRBY, PEXPIRE, PTTL, DEL, SCAN.
+    Satu koneksi per proses, diserialkan dengan lock; koneksi dibuka
+    ulang sekali jika putus (INCRBY / SET NX hanya jika belum terkirim).
+    """
+
+    def __init__(self, host: str, port: int, db: int = 0, password: str | None = None):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self._sock: socket.socket | None = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _open(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), timeout=SHARED_STATE_TIMEOUT)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile("rb")
+        if self.password:
+            self._roundtrip("AUTH", self.password)
+        if self.db:
+            self._roundtrip("SELECT", self.db)
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._file.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = self._file = None
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(out)
+
+    def _read_reply(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Koneksi shared state terputus")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise SharedStateError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2].decode()
+        if kind == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise SharedStateError(f"Balasan RESP tidak dikenal: {line!r}")
+
+    def _roundtrip(self, *args):
+        self._sock.sendall(self._encode(args))
+        return self._read_reply()
+
+    @staticmethod
+    def _repeatable(args) -> bool:
+        # INCRBY / SET NX yang balasannya hilang mungkin sudah dijalankan
+        # server; mengulangnya menghitung hit dua kali / salah melapor NX gagal
+        name = str(args[0]).upper()
+        return name not in ("INCR", "INCRBY") and not (name == "SET" and "NX" in map(str, args[3:]))
+
+    def command(self, *args):
+        with self._lock:
+            for attempt in range(2):
+                sent = False
+                try:
+                    if self._sock is None:
+                        self._open()
+                    self._sock.sendall(self._encode(args))
+                    sent = True
+                    return self._read_reply()
+                except (OSError, ConnectionError):
+                    self._close()
+                    # diulang sekali pada koneksi baru, kecuali perintah
+                    # tidak-idempoten yang mungkin sudah sampai ke server
+                    if attempt or (sent and not self._repeatable(args)):
+                        raise
+
+    def get(self, key: str):
+        return self.command("GET", key)
+
+    def set(self, key: str, value, ttl: float) -> None:
+        self.command("SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    def set_nx(self, key: str, value, ttl: float) -> bool:
+        return self.command("SET", key, value, "PX", max(1, int(ttl * 1000)), "NX") == "OK"
+
+    def incr(self, key: str, amount: int, ttl: float) -> int:
+        # counter dibuat dulu beserta TTL-nya (SET NX atomik), baru ditambah;
+        # INCRBY lalu PEXPIRE bisa meninggalkan counter tanpa TTL kalau
+        # koneksi putus di antaranya, dan limit itu tidak pernah reset
+        self.command("SET", key, 0, "PX", max(1, int(ttl * 1000)), "NX")
+        return self.command("INCRBY", key, amount)
+
+    def ttl(self, key: str) -> float | None:
+        remaining = self.command("PTTL", key)
+        return remaining / 1000 if remaining > 0 else None
+
+    def delete(self, key: str, value=None) -> None:
+        # GET + DEL tidak atomik, tapi marker yang dihapus selalu ber-TTL dan
+        # milik pemanggil, jadi jendela balapannya hanya saat TTL habis
+        if value is not None and self.get(key) != str(value):
+            return
+        self.command("DEL", key)
+
+    def clear(self, prefix: str) -> int:
+        cursor, removed = "0", 0
+        while True:
+            cursor, keys = self.command("SCAN", cursor, "MATCH", f"{prefix}*", "COUNT", 500)
+            if keys:
+                removed += self.command("DEL", *keys)
+            if cursor == "0":
+                return removed
+
+    def prune(self) -> None:
+        pass  # server menghapus key kedaluwarsa sendiri
+
+    def ping(self) -> bool:
+        return self.command("PING") == "PONG"
+
+
+def create_backend(url: str):
+    """memory:// → None (state per proses); selain itu backend bersama."""
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        return None
+    if parsed.scheme == "sqlite":
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if parsed.scheme == "redis":
+        db = int(parsed.path.lstrip("/") or 0)
+        return RespBackend(parsed.hostname or "127.0.0.1", parsed.port or 6379, db, parsed.password)
+    raise ValueError(f"SHARED_STATE_URL tidak dikenal: {url}")
+
+
+backend = create_backend(SHARED_STATE_URL)
+
+# error backend yang diperlakukan sebagai "state tidak tersedia"
+BACKEND_ERRORS = (SharedStateError, OSError, sqlite3.Error)
+
+
+def backend_name() -> str:
+    return urlparse(SHARED_STATE_URL).scheme
+
+
+# ─────────────────────────────────────────────
+#  CACHE BERSAMA (antarmuka sama dengan TTLCache)
+# ─────────────────────────────────────────────
+class SharedTTLCache:
+    """
+    Pengganti TTLCache yang menyimpan entry di backend bersama, jadi hasil
+    resolve satu worker langsung terpakai worker lain. Key dan value harus
+    bisa di-JSON-kan. Backend yang error diperlakukan sebagai cache miss.
+    Batas ukuran diserahkan ke backend (TTL + maxmemory Redis / prune SQLite).
+    """
+
+    def __init__(self, name: str, ttl: float, store):
+        self.name = name
+        self.ttl = ttl
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key) -> str:
+        return f"cache:{self.name}:{json.dumps(key, ensure_ascii=False)}"
+
+    def get(self, key, default=None):
+        try:
+            raw = self.store.get(self._key(key))
+        except BACKEND_ERRORS as e:
+            self.errors += 1
+            logger.warning(f"Shared cache {self.name} tidak bisa dibaca: {e}")
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key, value) -> None:
+        try:
+            self.store.set(self._key(key), json.dumps(value, ensure_ascii=False), self.ttl)
+        except BACKEND_ERRORS as e:
+            self.errors += 1
+            logger.warning(f"Shared cache {self.name} tidak bisa ditulis: {e}")
+
+    # dari coroutine: I/O backend (socket Redis / file SQLite) dijalankan di
+    # thread pool supaya event loop tidak ikut menunggu
+    async def aget(self, key, default=None):
+        return await run_in_threadpool(self.get, key, default)
+
+    async def aset(self, key, value) -> None:
+        await run_in_threadpool(self.set, key, value)
+
+    def clear(self) -> None:
+        self.store.clear(f"cache:{self.name}:")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": backend_name(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def make_cache(name: str, maxsize: int, ttl: float):
+    """TTLCache in-process untuk memory://, SharedTTLCache untuk backend bersama."""
+    if backend is None:
+        return TTLCache(maxsize=maxsize, ttl=ttl)
+    return SharedTTLCache(name, ttl, backend)
+
+
+def shared_cache(name: str, ttl: float) -> SharedTTLCache | None:
+    """Cache bersama hanya jika ada backend bersama; memory:// → None."""
+    return SharedTTLCache(name, ttl, backend) if backend is not None else None
+
+
+# ─────────────────────────────────────────────
+#  MARKER IN-FLIGHT ANTAR WORKER
+# ─────────────────────────────────────────────
+def acquire_marker(key: str, token: str, ttl: float) -> bool:
+    """
+    Klaim pekerjaan `key` untuk seluruh worker. True jika pemanggil boleh
+    mengerjakan: marker berhasil dipasang, state tidak dibagi (memory://),
+    atau backend error (lebih baik kerja dobel daripada macet). TTL menjaga
+    marker worker yang mati tidak menahan key selamanya.
+    """
+    if backend is None:
+        return True
+    try:
+        return backend.set_nx(f"inflight:{key}", token, ttl)
+    except BACKEND_ERRORS as e:
+        logger.warning(f"Marker {key} tidak bisa dipasang: {e}")
+        return True
+
+
+def release_marker(key: str, token: str) -> None:
+    if backend is None:
+        return
+    try:
+        backend.delete(f"inflight:{key}", token)
+    except BACKEND_ERRORS as e:
+        logger.warning(f"Marker {key} tidak bisa dilepas: {e}")
+
+
+# ─────────────────────────────────────────────
+#  STORAGE RATE LIMIT (limits / slowapi)
+# ─────────────────────────────────────────────
+class SharedLimitStorage(Storage):
+    """
+    Storage `limits` di atas backend bersama, supaya counter fixed-window
+    slowapi dihitung global untuk semua worker. Terdaftar sebagai skema
+    shared:// (lihat LIMITER_STORAGE_URI).
+    """
+
+    STORAGE_SCHEME = ["shared"]
+
+    def __init__(self, uri: str | None = None, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        if backend is None:
+            raise ValueError("shared:// butuh SHARED_STATE_URL selain memory://")
+        self.store = backend
+
+    @property
+    def base_exceptions(self):
+        return BACKEND_ERRORS
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        return self.store.incr(f"limit:{key}", amount, expiry)
+
+    def get(self, key: str) -> int:
+        return int(self.store.get(f"limit:{key}") or 0)
+
+    def get_expiry(self, key: str) -> float:
+        return time.time() + (self.store.ttl(f"limit:{key}") or 0)
+
+    def check(self) -> bool:
+        try:
+            return self.store.ping()
+        except BACKEND_ERRORS:
+            return False
+
+    def reset(self) -> int | None:
+        return self.store.clear("limit:")
+
+    def clear(self, key: str) -> None:
+        self.store.delete(f"limit:{key}")
+
+
+LIMITER_STORAGE_URI = "memory://" if backend is None else "shared://"
@@ -0,0 +1,51 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+# ─────────────────────────────────────────────
+#  SINGLE-FLIGHT: satu eksekusi per key
+# ─────────────────────────────────────────────
+class SingleFlight:
+    """
+    Request bersamaan dengan key yang sama menunggu satu Task yang sama dan
+    menerima hasil (atau error) yang sama. Task berjalan terpisah dari
+    request pemicunya, jadi kalau request itu dibatalkan (client putus),
+    penunggu lain tetap mendapat hasil.
+    """
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finished(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        # semua penunggu bisa sudah dibatalkan (shield): exception tetap
+        # dibaca di sini supaya tidak dilaporkan "never retrieved"; yang
+        # masih menunggu menerimanya lewat shield seperti biasa
+        if not task.cancelled():
+            task.exception()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "executions": self.calls,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,188 @@
+document.getElementById("summaryForm").addEventListener("submit", function (event) {
+    document.getElementById("loadingModal").classList.add("active");
+    document.getElementById("submitBtn").disabled = true;
+
+    // Browser modern: pakai endpoint streaming supaya progress tampil bertahap.
+    // Browser lama tetap submit form biasa ke /summarize.
+    if (window.fetch && window.ReadableStream && window.TextDecoder) {
+        event.preventDefault();
+        streamSummary(this);
+    }
+});
+
+function setLoadingText(text) {
+    document.getElementById("loadingDesc").textContent = text;
+}
+
+function finishLoading() {
+    document.getElementById("loadingModal").classList.remove("active");
+    document.getElementById("submitBtn").disabled = false;
+}
+
+function showError(detail) {
+    finishLoading();
+    document.getElementById("resultSection").hidden = true;
+    document.getElementById("errorMsg").textContent = detail;
+    document.getElementById("errorBox").hidden = false;
+    document.getElementById("errorBox").scrollIntoView({ behavior: "smooth" });
+}
+
+function showResult(data) {
+    document.getElementById("resultSummary").innerHTML = data.summary;
+    document.querySelectorAll(".jumlah-ulasan").forEach(function (el) {
+        el.textContent = data.jumlah_ulasan;
+    });
+    document.getElementById("reviewText").textContent = data.original_review;
+    document.getElementById("errorBox").hidden = true;
+    document.getElementById("resultSection").hidden = false;
+}
+
+function handleStreamEvent(event, data, state) {
+    if (event === "resolved") {
+        setLoadingText("Produk ditemukan, mengambil ulasan...");
+    } else if (event === "waiting") {
+        setLoadingText("Produk ini sedang diringkas untuk pengguna lain, menunggu hasil...");
+    } else if (event === "page") {
+        state.reviews += data.reviews;
+        const total = data.total_reviews ? " dari " + data.total_reviews : "";
+        setLoadingText("Mengambil halaman " + data.page + " (" + state.reviews + total + " ulasan)...");
+    } else if (event === "cleaned") {
+        setLoadingText("Membersihkan " + data.reviews + " ulasan (" + data.unique_reviews + " unik)...");
+    } else if (event === "map") {
+        setLoadingText("AI merangkum " + data.chunks + " bagian ulasan secara paralel...");
+    } else if (event === "model") {
+        setLoadingText("AI sedang merangkum " + data.reviews + " ulasan...");
+    } else if (event === "summary_chunk") {
+        if (!state.streaming) {
+            // potongan pertama dari model: tutup modal, tampilkan ringkasan yang sedang ditulis
+            state.streaming = true;
+            finishLoading();
+            showResult({ summary: "", jumlah_ulasan: "…", original_review: "" });
+            document.getElementById("resultSection").scrollIntoView({ behavior: "smooth" });
+        }
+        state.text += data.text;
+        document.getElementById("resultSummary").textContent = state.text;
+    } else if (event === "done") {
+        state.finished = true;
+        finishLoading();
+        showResult(data);
+        document.getElementById("resultSection").scrollIntoView({ behavior: "smooth" });
+    } else if (event === "error") {
+        state.finished = true;
+        showError(data.detail);
+    }
+}
+
+async function streamSummary(form) {
+    const state = { reviews: 0, text: "", streaming: false, finished: false };
+    try {
+        const response = await fetch("/summarize/stream", {
+            method: "POST",
+            body: new FormData(form),
+        });
+        if (!response.ok || !response.body) {
+            throw new Error("HTTP " + response.status);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let sep;
+            while ((sep = buffer.indexOf("\n\n")) !== -1) {
+                const block = buffer.slice(0, sep);
+                buffer = buffer.slice(sep + 2);
+                let event = "message";
+                let data = "";
+                block.split("\n").forEach(function (line) {
+                    if (line.startsWith("event:")) event = line.slice(6).trim();
+                    else if (line.startsWith("data:")) data += line.slice(5).trim();
+                });
+                handleStreamEvent(event, data ? JSON.parse(data) : {}, state);
+            }
+        }
+
+        if (!state.finished) {
+            showError("Koneksi terputus sebelum ringkasan selesai. Silakan coba lagi.");
+        }
+    } catch (err) {
+        if (!state.streaming) {
+            // streaming gagal (mis. proxy lama) → kirim form biasa
+            form.submit();
+        } else {
+            showError("Koneksi terputus sebelum ringkasan selesai. Silakan coba lagi.");
+        }
+    }
+}
+
+function toggleReviews() {
+    const container = document.getElementById("reviewContainer");
+    const btn = document.querySelector(".toggle-btn");
+    if (container.style.display === "none") {
+        container.style.display = "block";
+        btn.textContent = "Sembunyikan Ulasan";
+    } else {
+        container.style.display = "none";
+        btn.textContent = "Lihat Ulasan";
+    }
+}
+
+function copySampleUrl() {
+    const sampleUrl = document.querySelector('.sample-box-url').textContent.trim();
+    const input = document.querySelector('input[name="product_url"]');
+
+    navigator.clipboard.writeText(sampleUrl).then(function () {
+        input.value = sampleUrl;
+        const box = document.querySelector('.sample-box');
+        box.style.borderColor = '#00AA5B';
+        box.style.background = '#1E2E26';
+        showToast('URL berhasil disalin & ditempel!');
+        setTimeout(() => {
+            box.style.borderColor = '';
+            box.style.background = '';
+        }, 2000);
+    }).catch(function () {
+        input.value = sampleUrl;
+        input.select();
+        document.execCommand('copy');
+        showToast('URL berhasil disalin!');
+    });
+}
+
+function showToast(msg) {
+    const toast = document.createElement('div');
+    toast.textContent = msg;
+    toast.style.cssText = `
+        position: fixed;
+        bottom: 1.5rem;
+        left: 50%;
+        transform: translateX(-50%);
+        background: #00AA5B;
+        color: white;
+        padding: 0.6rem 1.25rem;
+        border-radius: 999px;
+        font-family: 'Plus Jakarta Sans', sans-serif;
+        font-size: 0.85rem;
+        font-weight: 600;
+        z-index: 10000;
+        box-shadow: 0 4px 20px rgba(0,0,0,0.2);
+        white-space: nowrap;
+        transition: opacity 0.3s ease;
+    `;
+    document.body.appendChild(toast);
+    setTimeout(() => {
+        toast.style.opacity = '0';
+        setTimeout(() => toast.remove(), 300);
+    }, 2000);
+}
+
+const urlParams = new URLSearchParams(window.location.search);
+const urlParam = urlParams.get('url');
+if (urlParam) {
+    document.querySelector('input[name="product_url"]').value = urlParam;
+}
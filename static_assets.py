@@ -0,0 +1,228 @@
+"""
+Pipeline aset statis: file di static/ disalin ke STATIC_BUILD_DIR dengan
+nama ber-hash isi (app.3f9c0a1b2d4e.css), varian gzip/brotli untuk file
+teks, dan varian WebP + resize untuk gambar. Karena nama berubah setiap isi
+berubah, file dilayani dengan Cache-Control immutable satu tahun.
+
+    python static_assets.py          # build manual (juga otomatis saat app start)
+
+Brotli dan WebP opsional: tanpa paket `brotli` / `Pillow` hanya gzip dan
+file asli yang dibuat.
+"""
+import gzip
+import hashlib
+import importlib.util
+import io
+import json
+import logging
+import mimetypes
+import os
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+logger = logging.getLogger(__name__)
+
+
+# ─────────────────────────────────────────────
+#  KONFIGURASI
+# ─────────────────────────────────────────────
+STATIC_SOURCE_DIR = os.getenv("STATIC_SOURCE_DIR", "static")
+STATIC_BUILD_DIR  = os.getenv("STATIC_BUILD_DIR", "data/static_build")
+ASSET_URL_PREFIX  = "/assets"
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+COMPRESSIBLE_EXTS = {".css", ".js", ".svg", ".html", ".json", ".txt"}
+COMPRESS_MAX_RATIO = 0.9            # varian terkompresi disimpan hanya jika ≤ 90% ukuran asli
+IMAGE_EXTS        = {".png", ".jpg", ".jpeg"}
+IMAGE_WIDTHS      = (480, 960)      # lebar varian WebP untuk srcset (selain lebar asli)
+IMAGE_MAX_WIDTH   = 1600            # varian terbesar tidak lebih lebar dari ini
+WEBP_QUALITY      = 80
+MANIFEST_NAME     = "manifest.json"
+
+HAS_BROTLI = importlib.util.find_spec("brotli") is not None
+HAS_PIL    = importlib.util.find_spec("PIL") is not None
+
+# urutan preferensi encoding saat negosiasi Accept-Encoding
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+# ─────────────────────────────────────────────
+#  BUILD
+# ─────────────────────────────────────────────
+def _hashed_name(name: str, data: bytes) -> str:
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+
+def _write(path: str, data: bytes) -> None:
+    # tulis atomik: beberapa worker bisa build bersamaan ke direktori yang sama
+    if os.path.exists(path):
+        return
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _write_compressed(out_dir: str, filename: str, data: bytes) -> list[str]:
+    encodings = []
+    variants = [("gzip", ".gz", lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+    if HAS_BROTLI:
+        import brotli
+        variants.insert(0, ("br", ".br", lambda d: brotli.compress(d, quality=11)))
+    for encoding, suffix, compress in variants:
+        compressed = compress(data)
+        if len(compressed) <= len(data) * COMPRESS_MAX_RATIO:
+            _write(os.path.join(out_dir, filename + suffix), compressed)
+            encodings.append(encoding)
+    return encodings
+
+
+def _webp_variants(out_dir: str, name: str, data: bytes) -> list[dict]:
+    from PIL import Image
+
+    stem = os.path.splitext(name)[0]
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    widths = sorted({w for w in IMAGE_WIDTHS if w < image.width} | {min(image.width, IMAGE_MAX_WIDTH)})
+
+    variants = []
+    for width in widths:
+        height = round(image.height * width / image.width)
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        buffer = io.BytesIO()
+        resized.save(buffer, "WEBP", quality=WEBP_QUALITY, method=6)
+        webp = buffer.getvalue()
+        filename = _hashed_name(f"{stem}-{width}w.webp", webp)
+        _write(os.path.join(out_dir, filename), webp)
+        variants.append({"file": filename, "width": width, "type": "image/webp"})
+    return variants
+
+
+def build_assets(source_dir: str = STATIC_SOURCE_DIR, out_dir: str = STATIC_BUILD_DIR) -> dict:
+    """
+    Bangun semua aset dan kembalikan manifest: nama asli → {file, source_hash,
+    encodings, variants}. File yang isinya tidak berubah sejak build
+    sebelumnya (source_hash sama di manifest lama) tidak diproses ulang.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    previous = load_manifest(out_dir)
+    manifest = {}
+
+    for name in sorted(os.listdir(source_dir)):
+        path = os.path.join(source_dir, name)
+        if not os.path.isfile(path):
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        source_hash = hashlib.sha256(data).hexdigest()
+
+        old = previous.get(name)
+        if old and old["source_hash"] == source_hash and _complete(out_dir, old):
+            manifest[name] = old
+            continue
+
+        ext = os.path.splitext(name)[1].lower()
+        filename = _hashed_name(name, data)
+        _write(os.path.join(out_dir, filename), data)
+        entry = {"file": filename, "source_hash": source_hash, "encodings": [], "variants": []}
+        if ext in COMPRESSIBLE_EXTS:
+            entry["encodings"] = _write_compressed(out_dir, filename, data)
+        if ext in IMAGE_EXTS and HAS_PIL:
+            try:
+                entry["variants"] = _webp_variants(out_dir, name, data)
+            except Exception as e:
+                logger.warning(f"Varian WebP {name} gagal dibuat: {e}")
+        manifest[name] = entry
+
+    _write_manifest(out_dir, manifest)
+    return manifest
+
+
+def _complete(out_dir: str, entry: dict) -> bool:
+    suffixes = dict(ENCODINGS)
+    files = [entry["file"]] + [v["file"] for v in entry["variants"]]
+    files += [entry["file"] + suffixes[e] for e in entry["encodings"]]
+    return all(os.path.exists(os.path.join(out_dir, f)) for f in files)
+
+
+def load_manifest(out_dir: str = STATIC_BUILD_DIR) -> dict:
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(out_dir: str, manifest: dict) -> None:
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+# ─────────────────────────────────────────────
+#  HELPER TEMPLATE
+# ─────────────────────────────────────────────
+class AssetUrls:
+    """Dipasang sebagai global Jinja: asset_url('app.css'), asset_srcset('tokped.png')."""
+
+    def __init__(self, manifest: dict):
+        self.manifest = manifest
+
+    def url(self, name: str) -> str:
+        entry = self.manifest.get(name)
+        if entry is None:
+            # aset belum di-build → fallback ke /static tanpa hash
+            return f"/static/{name}"
+        return f"{ASSET_URL_PREFIX}/{entry['file']}"
+
+    def srcset(self, name: str, mime_type: str = "image/webp") -> str:
+        entry = self.manifest.get(name) or {}
+        return ", ".join(
+            f"{ASSET_URL_PREFIX}/{v['file']} {v['width']}w"
+            for v in entry.get("variants", []) if v["type"] == mime_type
+        )
+
+
+# ─────────────────────────────────────────────
+#  SERVING
+# ─────────────────────────────────────────────
+class AssetFiles(StaticFiles):
+    """
+    StaticFiles untuk STATIC_BUILD_DIR: memilih varian .br/.gz sesuai
+    Accept-Encoding, ETag dari nama file ber-hash (stabil antar worker dan
+    deploy, beda dengan ETag mtime bawaan), 304 untuk If-None-Match yang
+    cocok, dan Cache-Control immutable.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        request_headers = Headers(scope=scope)
+        media_type = mimetypes.guess_type(str(full_path))[0] or "application/octet-stream"
+        headers = {"cache-control": ASSET_CACHE_CONTROL, "vary": "Accept-Encoding"}
+
+        accepted = {e.split(";")[0].strip() for e in request_headers.get("accept-encoding", "").split(",")}
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted and os.path.isfile(f"{full_path}{suffix}"):
+                full_path = f"{full_path}{suffix}"
+                stat_result = os.stat(full_path)
+                headers["content-encoding"] = encoding
+                break
+        headers["etag"] = f'"{os.path.basename(str(full_path))}"'
+
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result,
+                                headers=headers, media_type=media_type)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    built = build_assets()
+    for name, entry in built.items():
+        extra = entry["encodings"] + [f"{v['width']}w.webp" for v in entry["variants"]]
+        print(f"  {name:<24} → {entry['file']:<36} {' '.join(extra)}")
+    print(f"\nbrotli: {'ya' if HAS_BROTLI else 'tidak'}, WebP: {'ya' if HAS_PIL else 'tidak'}")
@@ -0,0 +1,107 @@
+"""
+Model server tiruan untuk pengujian offline.
+
+    python stub_model_server.py            # http://localhost:8002/summarize
+    MODEL_API_URL=http://localhost:8002/summarize python main.py
+
+Ringkasan dibuat secara ekstraktif (kalimat dikelompokkan per aspek
+berdasarkan kata kunci) dalam format yang sama dengan model asli:
+"intro • aspek: isi • aspek: isi". Latensi naik super-linear terhadap
+panjang teks seperti model asli; error 5xx bisa disuntikkan lewat env.
+"""
+import asyncio
+import os
+import random
+import re
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+
+# ─────────────────────────────────────────────
+#  KONFIGURASI
+# ─────────────────────────────────────────────
+STUB_PORT              = int(os.getenv("STUB_PORT", 8002))
+STUB_BASE_LATENCY      = float(os.getenv("STUB_BASE_LATENCY", 0.2))       # detik per request
+STUB_LATENCY_PER_KCHAR = float(os.getenv("STUB_LATENCY_PER_KCHAR", 0.1))  # × (karakter/1000)^1.5
+STUB_FAIL_RATE         = float(os.getenv("STUB_FAIL_RATE", 0))            # peluang menjawab 503
+STUB_STREAM_DELAY      = 0.01   # detik antar potongan SSE
+
+ASPECTS = {
+    "kualitas":   ["kualitas", "bahan", "kain", "jahitan", "awet", "tebal", "tipis", "rapi", "original", "ori"],
+    "pengiriman": ["pengiriman", "kirim", "dikirim", "kurir", "packing", "paket", "sampai", "cepat", "lama"],
+    "harga":      ["harga", "murah", "mahal", "worth", "sesuai harga", "diskon"],
+    "ukuran":     ["ukuran", "size", "kecil", "besar", "kekecilan", "kebesaran", "pas", "longgar", "sempit"],
+    "penjual":    ["penjual", "seller", "toko", "respon", "ramah", "admin"],
+}
+POSITIVE = {"bagus", "mantap", "puas", "cepat", "rapi", "murah", "ramah", "sesuai", "oke", "ok", "recommended", "suka", "awet"}
+NEGATIVE = {"jelek", "rusak", "kecewa", "lama", "mahal", "cacat", "kurang", "buruk", "tipis", "sobek", "telat"}
+MAX_SNIPPETS = 2
+
+app = FastAPI()
+
+
+class SummarizeRequest(BaseModel):
+    text: str
+    stream: bool = False
+
+
+def _sentences(text: str) -> list[str]:
+    out = []
+    for part in re.split(r"[.•\n]+", text):
+        # bullet ringkasan parsial ("kualitas: bagus") → ambil isinya saja
+        part = re.sub(r"^\s*[a-z ]+:\s*", "", part.strip().lower())
+        if part:
+            out.append(part)
+    return out
+
+
+def summarize(text: str) -> str:
+    sentences = _sentences(text)
+    words = " ".join(sentences).split()
+    pos = sum(w in POSITIVE for w in words)
+    neg = sum(w in NEGATIVE for w in words)
+    if pos >= 2 * neg:
+        intro = "secara umum pembeli puas dengan produk ini"
+    elif neg >= 2 * pos:
+        intro = "banyak pembeli kecewa dengan produk ini"
+    else:
+        intro = "pendapat pembeli tentang produk ini beragam"
+
+    bullets = []
+    for aspect, keywords in ASPECTS.items():
+        snippets = []
+        for sentence in sentences:
+            if any(k in sentence for k in keywords) and sentence not in snippets:
+                snippets.append(sentence)
+        if snippets:
+            snippets.sort(key=len)
+            bullets.append(f"{aspect}: {', '.join(snippets[:MAX_SNIPPETS])}")
+
+    return " • ".join([intro] + bullets)
+
+
+async def _sse_words(summary: str):
+    for word in re.split(r"(?<= )", summary):
+        yield f"data: {word}\n\n"
+        await asyncio.sleep(STUB_STREAM_DELAY)
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/summarize")
+async def summarize_endpoint(body: SummarizeRequest):
+    if STUB_FAIL_RATE and random.random() < STUB_FAIL_RATE:
+        return JSONResponse(status_code=503, content={"detail": "stub: model sibuk"})
+
+    await asyncio.sleep(STUB_BASE_LATENCY + STUB_LATENCY_PER_KCHAR * (len(body.text) / 1000) ** 1.5)
+    summary = summarize(body.text)
+
+    if body.stream:
+        return StreamingResponse(_sse_words(summary), media_type="text/event-stream")
+    return {"summary": summary}
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="127.0.0.1", port=STUB_PORT)
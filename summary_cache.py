@@ -0,0 +1,91 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+
+# ─────────────────────────────────────────────
+#  KONFIGURASI
+# ─────────────────────────────────────────────
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", "data/summary_cache.sqlite3")
+SUMMARY_FRESH_TTL  = int(os.getenv("SUMMARY_FRESH_TTL", 6 * 60 * 60))   # detik entry dianggap fresh
+
+
+# ─────────────────────────────────────────────
+#  CACHE RINGKASAN DI DISK (SQLite)
+# ─────────────────────────────────────────────
+class SummaryCache:
+    """
+    product_id → ringkasan yang sudah di-render, jumlah ulasan dan hash
+    set ulasan bersih. Semua method bersifat blocking (dipanggil lewat
+    run_in_threadpool dari handler async).
+    """
+
+    def __init__(self, path: str = SUMMARY_CACHE_PATH, fresh_ttl: int = SUMMARY_FRESH_TTL):
+        self.path = path
+        self.fresh_ttl = fresh_ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS summaries (
+                    product_id      TEXT PRIMARY KEY,
+                    summary_html    TEXT NOT NULL,
+                    raw_summary     TEXT NOT NULL,
+                    original_review TEXT NOT NULL,
+                    total_reviews   INTEGER NOT NULL,
+                    review_hash     TEXT NOT NULL,
+                    updated_at      REAL NOT NULL
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, product_id: str) -> dict | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM summaries WHERE product_id = ?", (product_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        entry["is_fresh"] = time.time() - entry["updated_at"] < self.fresh_ttl
+        return entry
+
+    def set(self, product_id: str, summary_html: str, raw_summary: str,
+            original_review: str, total_reviews: int, review_hash: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO summaries
+                    (product_id, summary_html, raw_summary, original_review,
+                     total_reviews, review_hash, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (product_id, summary_html, raw_summary, original_review,
+                 total_reviews, review_hash, time.time()),
+            )
+
+    def touch(self, product_id: str) -> None:
+        """Tandai entry fresh lagi tanpa mengubah isinya (hash ulasan sama)."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE summaries SET updated_at = ? WHERE product_id = ?",
+                (time.time(), product_id),
+            )
+
+    def delete(self, product_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM summaries WHERE product_id = ?", (product_id,))